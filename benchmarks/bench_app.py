@@ -0,0 +1,300 @@
+"""
+Suíte de benchmark e regressão do cadastro.py, executada sem navegador (streamlit.testing AppTest).
+
+Cenários medidos (cada um repetido --repeticoes vezes, com uma sessão nova preparada fora da medição):
+  primeira_renderizacao   primeira execução de uma sessão nova (processo já aquecido;
+                          a partida a frio fica com check_startup.py)
+  edicao_de_campo         rerun depois de editar um campo fora do formulário (Nome / Razão Social)
+  endereco_entrega        marcar "Cadastrar Endereço de Entrega"
+  referencias             marcar "Cadastrar Referências"
+  limpar_cadastro         "Limpar Cadastro" com a ficha preenchida (clear_form)
+  gerar_ficha             envio de uma ficha válida completa, com geração do xlsx
+
+Para cada cenário registra os percentis de latência (p50, p90, p99) e o pico de memória alocada
+durante o passo (tracemalloc, numa repetição à parte). Também roda N sessões ao mesmo tempo no
+mesmo processo, cada uma preenchendo e enviando fichas completas. O AppTest não permite duas
+execuções simultâneas, então os reruns das sessões entram numa fila (uma trava): essas medidas
+mostram a vazão e a espera na fila de um worker, não paralelismo (grupo "sessoes_em_fila").
+
+Os resultados são gravados em JSON. Se existir um arquivo de base (--base), cada p50 e pico de
+memória é comparado com ele, e o comando termina com código 1 se algum piorar mais que --limite
+(também configurável pela variável de ambiente CADASTRO_LIMITE_REGRESSAO). Pioras absolutas
+menores que --folga-ms / --folga-kib são ignoradas: nos cenários de dezenas de milissegundos, o
+ruído do agendador entre duas execuções iguais já passa de 20%.
+
+Sem arquivo de base o comando também termina com código 1: a base depende da máquina, então
+cada máquina (ou runner de CI) grava a sua com --gravar-base antes de comparar. Os resultados
+trazem os dados da máquina, e a comparação avisa se a base veio de outra.
+
+Uso:
+    python benchmarks/bench_app.py --gravar-base            # mede e grava a base desta máquina
+    python benchmarks/bench_app.py [--limite 0.2]           # mede e compara com a base
+    python benchmarks/bench_app.py --sessoes 1 4 8 --fichas-por-sessao 3
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(RAIZ, "cadastro.py")
+
+# O registro de clientes da medição vai para um banco temporário, não para o clientes.db
+os.environ.setdefault("CADASTRO_DB", os.path.join(tempfile.mkdtemp(prefix="bench_app_"), "clientes.db"))
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+from bench_reruns import FICHA_EXEMPLO, TOGGLES, _botao, _widget
+
+PADRAO_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados_app.json")
+PADRAO_BASE = os.path.join(RAIZ, "benchmarks", "base_app.json")
+
+
+def rodar(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return at
+
+
+# --- Preparação das Sessões (fora da medição) ---
+def sessao_nova():
+    return AppTest.from_file(SCRIPT, default_timeout=120)
+
+
+def sessao_renderizada():
+    return rodar(sessao_nova())
+
+
+def ficha_preenchida(executar=rodar):
+    """
+    Sessão com as seções opcionais abertas e todos os campos da FICHA_EXEMPLO preenchidos,
+    pronta para ser enviada. `executar` roda cada rerun (permite medir cada um).
+    """
+    at = executar(sessao_nova())
+    for key in TOGGLES:
+        _widget(at, key).check()
+        executar(at)
+    # Os campos fora do formulário (que provocam rerun) ficam no topo e são preenchidos primeiro
+    no_formulario = {key: bool(_widget(at, key).form_id) for key in FICHA_EXEMPLO}
+    for key in sorted(FICHA_EXEMPLO, key=no_formulario.get):
+        w = _widget(at, key)
+        w.set_value(FICHA_EXEMPLO[key])
+        if not w.form_id:
+            executar(at)
+    return at
+
+
+# --- Passos Medidos ---
+def gerar_ficha(at):
+    _botao(at, "Gerar e Baixar Ficha em Excel").click()
+    rodar(at)
+    if not at.download_button:
+        raise RuntimeError("a ficha não foi gerada: " + "; ".join(e.value for e in at.error))
+
+
+def limpar_cadastro(at):
+    _botao(at, "Limpar Cadastro").click()
+    rodar(at)
+    if at.session_state["nome_input"]:
+        raise RuntimeError("o formulário não foi limpo")
+
+
+def editar_campo(at):
+    _widget(at, "nome_input").set_value("Cliente Exemplo")
+    rodar(at)
+
+
+def marcar(key):
+    def passo(at):
+        _widget(at, key).check()
+        rodar(at)
+    return passo
+
+
+CENARIOS = {
+    "primeira_renderizacao": (sessao_nova, rodar),
+    "edicao_de_campo": (sessao_renderizada, editar_campo),
+    "endereco_entrega": (sessao_renderizada, marcar("show_endereco_entrega_checkbox")),
+    "referencias": (sessao_renderizada, marcar("show_referencias_checkbox")),
+    "limpar_cadastro": (ficha_preenchida, limpar_cadastro),
+    "gerar_ficha": (ficha_preenchida, gerar_ficha),
+}
+
+
+def percentis(segundos):
+    ms = sorted(s * 1000 for s in segundos)
+    cortes = statistics.quantiles(ms, n=100, method="inclusive") if len(ms) > 1 else ms * 99
+    return {"p50_ms": round(statistics.median(ms), 2), "p90_ms": round(cortes[89], 2),
+            "p99_ms": round(cortes[98], 2), "max_ms": round(ms[-1], 2)}
+
+
+def medir_cenario(preparar, passo, repeticoes):
+    passo(preparar())  # aquecimento: imports e caches do processo fora da medição
+    tempos = []
+    for _ in range(repeticoes):
+        at = preparar()
+        gc.collect()  # o lixo das sessões anteriores não deve ser coletado dentro da medição
+        inicio = time.perf_counter()
+        passo(at)
+        tempos.append(time.perf_counter() - inicio)
+
+    at = preparar()
+    tracemalloc.start()
+    passo(at)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {**percentis(tempos), "pico_kib": round(pico / 1024)}
+
+
+# --- Sessões Simultâneas ---
+def medir_sessoes(quantidade, fichas_por_sessao):
+    """
+    `quantidade` sessões em threads, cada uma preenchendo e enviando fichas completas. Retorna a
+    vazão e os percentis de latência de todos os reruns, incluindo a espera na fila.
+
+    O AppTest instala um Runtime global durante cada execução, então execuções de sessões
+    diferentes não podem se sobrepor: elas entram em fila numa trava e rodam uma de cada vez.
+    A medida mostra quanto um atendente espera quando outros usam o mesmo worker, não o ganho
+    ou a disputa de execuções em paralelo.
+    """
+    tempos, erros = [], []
+    execucao = threading.Lock()
+
+    def medir(at):
+        inicio = time.perf_counter()
+        with execucao:
+            rodar(at)
+            tempos.append(time.perf_counter() - inicio)
+        return at
+
+    def atendente():
+        try:
+            for _ in range(fichas_por_sessao):
+                at = ficha_preenchida(medir)
+                _botao(at, "Gerar e Baixar Ficha em Excel").click()
+                medir(at)
+                if not at.download_button:
+                    raise RuntimeError("a ficha não foi gerada")
+        except Exception as erro:
+            erros.append(erro)
+
+    threads = [threading.Thread(target=atendente) for _ in range(quantidade)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - inicio
+    if erros:
+        raise RuntimeError(f"{len(erros)} sessão(ões) falharam: {erros[0]}")
+    return {"execucao": "serializada", "fichas_por_s": round(quantidade * fichas_por_sessao / total, 2),
+            "reruns": len(tempos), **percentis(tempos)}
+
+
+# --- Comparação com a Base ---
+def maquina():
+    """
+    Dados da máquina gravados junto dos resultados: a base só vale para a mesma máquina.
+    """
+    return {"sistema": platform.platform(), "processador": platform.processor() or platform.machine(),
+            "nucleos": os.cpu_count(), "python": platform.python_implementation()}
+
+def regressoes(resultados, base, limite, folgas):
+    """
+    Lista as medidas (p50 e pico de memória) que pioraram mais que `limite` em relação à base e
+    mais que a folga absoluta da medida (`folgas`, em ms ou KiB).
+    """
+    encontradas = []
+    for grupo in ("cenarios", "sessoes_em_fila"):
+        for nome, medidas in resultados.get(grupo, {}).items():
+            anteriores = base.get(grupo, {}).get(nome, {})
+            for medida, folga in folgas.items():
+                atual, anterior = medidas.get(medida), anteriores.get(medida)
+                if atual is None or not anterior:
+                    continue
+                variacao = atual / anterior - 1
+                if variacao > limite and atual - anterior > folga:
+                    encontradas.append(f"{grupo}/{nome} {medida}: {anterior} -> {atual} (+{variacao:.0%})")
+    return encontradas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=20, help="Repetições de cada cenário.")
+    parser.add_argument("--cenarios", nargs="+", choices=list(CENARIOS), default=list(CENARIOS))
+    parser.add_argument("--sessoes", type=int, nargs="*", default=[1, 4, 8], help="Quantidades de sessões simultâneas.")
+    parser.add_argument("--fichas-por-sessao", type=int, default=3)
+    parser.add_argument("--saida", default=PADRAO_RESULTADOS, help="Arquivo JSON com os resultados.")
+    parser.add_argument("--base", default=PADRAO_BASE, help="Arquivo JSON de base para a comparação.")
+    parser.add_argument("--gravar-base", action="store_true", help="Grava os resultados como a nova base.")
+    parser.add_argument("--limite", type=float, default=float(os.environ.get("CADASTRO_LIMITE_REGRESSAO", 0.2)),
+                        help="Piora máxima tolerada em relação à base (0.2 = 20%%).")
+    parser.add_argument("--folga-ms", type=float, default=10, help="Piora absoluta de p50 sempre tolerada.")
+    parser.add_argument("--folga-kib", type=float, default=64, help="Piora absoluta de memória sempre tolerada.")
+    args = parser.parse_args()
+
+    # O app abre a logo por caminho relativo, então rodamos a partir da raiz do repositório.
+    os.chdir(RAIZ)
+    resultados = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "maquina": maquina(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "repeticoes": args.repeticoes,
+        "cenarios": {},
+        "sessoes_em_fila": {},
+    }
+
+    print(f"{'cenário':<26} {'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9} {'pico (KiB)':>11}")
+    for nome in args.cenarios:
+        medidas = resultados["cenarios"][nome] = medir_cenario(*CENARIOS[nome], args.repeticoes)
+        print(f"{nome:<26} {medidas['p50_ms']:>9.1f} {medidas['p90_ms']:>9.1f} {medidas['p99_ms']:>9.1f} "
+              f"{medidas['pico_kib']:>11}")
+
+    if args.sessoes:
+        print(f"\n{'sessões (reruns em fila)':<26} {'fichas/s':>9} {'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9}")
+    for quantidade in args.sessoes:
+        medidas = resultados["sessoes_em_fila"][str(quantidade)] = medir_sessoes(quantidade, args.fichas_por_sessao)
+        print(f"{quantidade:<26} {medidas['fichas_por_s']:>9.2f} {medidas['p50_ms']:>9.1f} "
+              f"{medidas['p90_ms']:>9.1f} {medidas['p99_ms']:>9.1f}")
+
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+    print(f"\nresultados gravados em {args.saida}")
+
+    if args.gravar_base:
+        with open(args.base, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+        print(f"base gravada em {args.base}")
+        return 0
+    if not os.path.exists(args.base):
+        print(f"ERRO: sem base em {args.base} para comparar. Grave a base desta máquina com --gravar-base.")
+        return 1
+
+    with open(args.base, encoding="utf-8") as arquivo:
+        base = json.load(arquivo)
+    if base.get("maquina") != resultados["maquina"]:
+        print(f"aviso: a base foi gravada em outra máquina ou ambiente ({base.get('maquina')}); "
+              "a comparação pode acusar diferenças que não são regressões")
+    piores = regressoes(resultados, base, args.limite, {"p50_ms": args.folga_ms, "pico_kib": args.folga_kib})
+    if piores:
+        print(f"REGRESSÃO (limite de {args.limite:.0%}):")
+        for linha in piores:
+            print(f"  {linha}")
+        return 1
+    print(f"sem regressões em relação à base (limite de {args.limite:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
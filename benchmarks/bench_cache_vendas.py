@@ -0,0 +1,118 @@
+"""
+Compara a carga do histórico de vendas pelo CSV (pd.read_csv) com o cache colunar Parquet
+(vendas.carregar_vendas) com o df_vendas.csv repetido 1x, 100x e 1000x.
+
+Cada cópia do arquivo desloca as datas em um dia e renumera as notas, para que o filtro por
+data tenha grupos de linhas para descartar. Cada carga roda em um processo novo, e mede:
+  - tempo da carga;
+  - RSS do processo depois da carga e o pico durante ela (descontado o processo já com os imports);
+  - memória ocupada pelo DataFrame (memory_usage(deep=True)).
+
+Uso:
+    python benchmarks/bench_cache_vendas.py [--escalas 1 100 1000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from vendas import COLUNAS_DATA, converter_vendas
+
+# Executado em um processo novo a cada medição.
+MEDICAO = r"""
+import json, sys, time
+from datetime import date
+sys.path.insert(0, sys.argv[1])
+import pandas as pd
+import pyarrow.parquet
+import vendas
+
+def memoria():
+    valores = {}
+    with open("/proc/self/status") as status:
+        for linha in status:
+            chave, _, valor = linha.partition(":")
+            if chave in ("VmRSS", "VmHWM"):
+                valores[chave] = int(valor.split()[0])
+    return valores["VmRSS"], valores["VmHWM"]
+
+caminho, modo = sys.argv[2], sys.argv[3]
+with open("/proc/self/clear_refs", "w") as refs:
+    refs.write("5")  # zera o pico (VmHWM) depois dos imports
+antes, _ = memoria()
+inicio = time.perf_counter()
+if modo == "csv":
+    df = pd.read_csv(caminho)
+elif modo == "parquet":
+    df = vendas.carregar_vendas(caminho=caminho)
+elif modo == "parquet_colunas":
+    df = vendas.carregar_vendas(["Cliente", "Valor_Total_Item"], caminho=caminho)
+else:
+    df = vendas.carregar_vendas(["Cliente", "Valor_Total_Item"], [("Data_Emissao", ">=", date.fromisoformat(modo))],
+                                caminho=caminho)
+segundos = time.perf_counter() - inicio
+depois, pico = memoria()
+print(json.dumps({"s": segundos, "rss": (depois - antes) / 1024, "pico": (pico - antes) / 1024,
+                  "df": df.memory_usage(deep=True).sum() / 1024 / 1024, "linhas": len(df)}))
+"""
+
+
+def gerar_csv(caminho, escala):
+    import pandas as pd
+
+    base = pd.read_csv(os.path.join(RAIZ, "df_vendas.csv"), dtype=str, keep_default_na=False)
+    datas = {coluna: pd.to_datetime(base[coluna], format="%d/%m/%Y", errors="coerce") for coluna in COLUNAS_DATA}
+    nf = base["NF"].astype(int)
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        for copia in range(escala):
+            deslocada = base.copy()
+            for coluna, data in datas.items():
+                deslocada[coluna] = (data + pd.Timedelta(days=copia)).dt.strftime("%d/%m/%Y").fillna("")
+            deslocada["NF"] = (nf + copia * 100_000).astype(str)
+            deslocada.to_csv(arquivo, index=False, header=copia == 0)
+    return datas["Data_Emissao"].max() + pd.Timedelta(days=escala - 1)
+
+
+def medir(caminho, modo):
+    saida = subprocess.run([sys.executable, "-c", MEDICAO, RAIZ, caminho, modo],
+                           capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", type=int, nargs="+", default=[1, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'escala':>6} {'carga':<30} {'linhas':>8} {'tempo (s)':>9} {'RSS (MB)':>9} {'pico (MB)':>9} {'DataFrame (MB)':>14}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for escala in args.escalas:
+            caminho = os.path.join(pasta, f"vendas_{escala}x.csv")
+            ultima = gerar_csv(caminho, escala)
+            inicio = time.perf_counter()
+            cache = converter_vendas(caminho)
+            conversao = time.perf_counter() - inicio
+            print(f"{escala:>5}x CSV {os.path.getsize(caminho) / 1024 / 1024:.1f} MB -> Parquet "
+                  f"{os.path.getsize(cache) / 1024 / 1024:.1f} MB, conversão (uma vez) {conversao:.2f} s")
+            ultimo_mes = (ultima - timedelta(days=30)).date().isoformat()
+            cargas = {
+                "csv": "pd.read_csv",
+                "parquet": "Parquet, todas as colunas",
+                "parquet_colunas": "Parquet, 2 colunas",
+                ultimo_mes: "Parquet, 2 colunas, último mês",
+            }
+            for modo, nome in cargas.items():
+                r = medir(caminho, modo)
+                print(f"{escala:>5}x {nome:<30} {r['linhas']:>8} {r['s']:>9.3f} {r['rss']:>9.1f} "
+                      f"{r['pico']:>9.1f} {r['df']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
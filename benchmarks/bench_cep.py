@@ -0,0 +1,98 @@
+"""
+Mede a base de CEPs offline (cep.py) com uma base sintética do tamanho da brasileira.
+
+Gera um CSV com N CEPs, compila para o arquivo binário e mede:
+  - tempo de compilação e tamanho do arquivo;
+  - latência por consulta direto no arquivo (sem cache), com o cache LRU e para CEP inexistente;
+  - quanto a memória anônima (privada) do processo cresce ao abrir a base e fazer as consultas.
+    As páginas do mmap contam como memória de arquivo, compartilhada entre processos.
+
+Uso:
+    python benchmarks/bench_cep.py [--ceps N] [--consultas N]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cep import BaseCep, compilar, formatar_cep
+from validacao import UFS
+
+
+def memoria_kib():
+    """
+    (anônima, de arquivo) em KiB, lidas de /proc/self/status (Linux).
+    """
+    valores = {}
+    with open("/proc/self/status") as status:
+        for linha in status:
+            chave, _, valor = linha.partition(":")
+            if chave in ("RssAnon", "RssFile"):
+                valores[chave] = int(valor.split()[0])
+    return valores.get("RssAnon", 0), valores.get("RssFile", 0)
+
+
+def gerar_csv(caminho, quantidade, rng):
+    ufs = sorted(UFS)
+    cidades = [f"Cidade {i}" for i in range(5_000)]
+    bairros = [f"Bairro {i}" for i in range(20_000)]
+    ceps = rng.sample(range(1_000_000, 99_999_999), quantidade)
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(("cep", "logradouro", "bairro", "cidade", "uf"))
+        for numero in ceps:
+            escritor.writerow((formatar_cep(numero), f"Rua Projetada {numero % 7919}", rng.choice(bairros),
+                               rng.choice(cidades), rng.choice(ufs)))
+    return ceps
+
+
+def por_consulta_us(funcao, valores):
+    inicio = time.perf_counter()
+    for valor in valores:
+        funcao(valor)
+    return (time.perf_counter() - inicio) / len(valores) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ceps", type=int, default=900_000)
+    parser.add_argument("--consultas", type=int, default=100_000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        entrada, saida = os.path.join(pasta, "ceps.csv"), os.path.join(pasta, "ceps.bin")
+        ceps = gerar_csv(entrada, args.ceps, rng)
+        inicio = time.perf_counter()
+        compilar(entrada, saida)
+        print(f"compilação: {args.ceps} CEPs em {time.perf_counter() - inicio:.1f} s, "
+              f"{os.path.getsize(entrada) / 1024 / 1024:.1f} MB (CSV) -> {os.path.getsize(saida) / 1024 / 1024:.1f} MB")
+
+        existentes = [formatar_cep(n) for n in rng.choices(ceps, k=args.consultas)]
+        inexistentes = [formatar_cep(n) for n in rng.sample(range(100_000, 999_999), args.consultas)]
+        frequentes = [rng.choice(existentes[:1000]) for _ in range(args.consultas)]
+
+        anonima_antes, _ = memoria_kib()
+        sem_cache = BaseCep(saida, tamanho_cache=0)
+        print(f"consulta no arquivo (sem cache):  {por_consulta_us(sem_cache.buscar, existentes):6.2f} µs")
+        print(f"CEP inexistente (sem cache):      {por_consulta_us(sem_cache.buscar, inexistentes):6.2f} µs")
+        com_cache = BaseCep(saida)
+        por_consulta_us(com_cache.buscar, frequentes)  # aquece o LRU
+        print(f"consulta com cache LRU (acerto):  {por_consulta_us(com_cache.buscar, frequentes):6.2f} µs")
+        anonima_depois, arquivo = memoria_kib()
+        print(f"memória anônima do processo: +{(anonima_depois - anonima_antes) / 1024:.1f} MB "
+              f"(páginas do mmap, compartilhadas: {arquivo / 1024:.1f} MB de arquivo em RSS)")
+
+        if sem_cache.buscar(existentes[0]) is None or sem_cache.buscar("00000-000") is not None:
+            sys.exit("A consulta devolveu um resultado errado")
+        sem_cache.close()
+        com_cache.close()
+
+
+if __name__ == "__main__":
+    main()
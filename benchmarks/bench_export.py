@@ -0,0 +1,178 @@
+"""
+Compara a exportação da ficha pelo caminho antigo (dados_cliente -> lista de dicts -> DataFrame
+-> pd.ExcelWriter) com a exportação dirigida pelo esquema (ficha.exportar_ficha).
+
+Mede latência por ficha (mediana) e pico de memória alocada (tracemalloc), e confere que as
+duas planilhas têm exatamente as mesmas células.
+
+Uso:
+    python benchmarks/bench_export.py [--repeticoes N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from ficha import exportar_ficha
+
+ESTADO_EXEMPLO = {
+    "nome_input": "Clínica Veterinária Exemplo LTDA",
+    "fantasia_input": "Vet Exemplo",
+    "insc_estadual_input": "123456789",
+    "insc_municipal_input": "",
+    "email_input": "contato@vetexemplo.com.br",
+    "telefone_input": "8532345678",
+    "celular_input": "",
+    "tipo_doc_radio": "CNPJ",
+    "cpf_input": "",
+    "cnpj_input": "11222333000181",
+    "cliente_cep_input": "60115170",
+    "cliente_logradouro_input": "Rua Exemplo",
+    "cliente_numero_input": "100",
+    "cliente_complemento_input": "",
+    "cliente_bairro_input": "Aldeota",
+    "cliente_cidade_input": "Fortaleza",
+    "cliente_estado_input": "ce",
+    "show_endereco_entrega": True,
+    "entrega_cep_input": "60115170",
+    "entrega_rua_input": "Rua Exemplo",
+    "entrega_numero_input": "200",
+    "entrega_complemento_input": "",
+    "entrega_bairro_input": "Aldeota",
+    "entrega_cidade_input": "Fortaleza",
+    "entrega_estado_input": "ce",
+    "doc_contrato_social": True,
+    "doc_comprovante_endereco": False,
+    "show_referencias": True,
+    "ref1_nome": "",
+    "ref1_contato": "",
+    "ref2_nome": "Fornecedor B",
+    "ref2_contato": "8531111111",
+    "ref3_nome": "Fornecedor C",
+    "ref3_contato": "",
+    "observacao_area": "",
+}
+
+
+def exportar_pandas(e):
+    """Caminho de exportação anterior ao esquema, reproduzido a partir do cadastro.py original."""
+    ni = "Não informado"
+    documento = e["cpf_input"] if e["tipo_doc_radio"] == "CPF" else e["cnpj_input"]
+    dados_cliente = {
+        "Nome/Razão Social": e["nome_input"],
+        "Nome Fantasia": e["fantasia_input"] or ni,
+        "Inscrição Estadual": e["insc_estadual_input"] or ni,
+        "Inscrição Municipal": e["insc_municipal_input"] or ni,
+        "Email": e["email_input"] or ni,
+        "Telefone": e["telefone_input"],
+        "Celular": e["celular_input"] or ni,
+        "Tipo Documento": e["tipo_doc_radio"],
+        "Documento": documento,
+        "Endereço do Cliente (Principal)": {
+            "CEP": e["cliente_cep_input"],
+            "Logradouro": e["cliente_logradouro_input"],
+            "Número": e["cliente_numero_input"],
+            "Complemento": e["cliente_complemento_input"] or ni,
+            "Bairro": e["cliente_bairro_input"],
+            "Cidade": e["cliente_cidade_input"],
+            "Estado": e["cliente_estado_input"].upper(),
+        },
+        "Endereço de Entrega (Opcional)": {},
+        "Documentos Entregues": {
+            "Contrato Social": "Sim" if e["doc_contrato_social"] else "Não",
+            "Comprovante de Endereço": "Sim" if e["doc_comprovante_endereco"] else "Não",
+        },
+        "Referências": [],
+        "Observações": e["observacao_area"] or "Nenhuma observação.",
+    }
+    entrega = e["show_endereco_entrega"]
+    dados_cliente["Endereço de Entrega (Opcional)"] = {
+        "CEP": (entrega and e["entrega_cep_input"]) or ni,
+        "Rua/Avenida": (entrega and e["entrega_rua_input"]) or ni,
+        "Número": (entrega and e["entrega_numero_input"]) or ni,
+        "Complemento": (entrega and e["entrega_complemento_input"]) or ni,
+        "Bairro": (entrega and e["entrega_bairro_input"]) or ni,
+        "Cidade": (entrega and e["entrega_cidade_input"]) or ni,
+        "Estado": (entrega and e["entrega_estado_input"].upper()) or ni,
+    }
+    if e["show_referencias"]:
+        for i in (1, 2, 3):
+            nome, contato = e[f"ref{i}_nome"], e[f"ref{i}_contato"]
+            if nome or contato:
+                dados_cliente["Referências"].append({"Nome": nome or ni, "Contato": contato or ni})
+    if not dados_cliente["Referências"]:
+        dados_cliente["Referências"].append({"Nome": ni, "Contato": ni})
+
+    principal = dados_cliente["Endereço do Cliente (Principal)"]
+    entrega = dados_cliente["Endereço de Entrega (Opcional)"]
+    data_for_excel = [{"Campo": k, "Valor": dados_cliente[k]} for k in (
+        "Nome/Razão Social", "Nome Fantasia", "Inscrição Estadual", "Inscrição Municipal",
+        "Email", "Telefone", "Celular", "Tipo Documento", "Documento")]
+    data_for_excel += [{"Campo": f"Endereço Principal - {k}", "Valor": v} for k, v in principal.items()]
+    data_for_excel += [{"Campo": f"Endereço Entrega - {k}", "Valor": v} for k, v in entrega.items()]
+    data_for_excel += [
+        {"Campo": "Documento: Contrato Social Entregue?", "Valor": dados_cliente["Documentos Entregues"]["Contrato Social"]},
+        {"Campo": "Documento: Comprovante de Endereço Entregue?", "Valor": dados_cliente["Documentos Entregues"]["Comprovante de Endereço"]},
+    ]
+    for i, ref in enumerate(dados_cliente["Referências"]):
+        data_for_excel.append({"Campo": f"Referência {i+1} Nome", "Valor": ref["Nome"]})
+        data_for_excel.append({"Campo": f"Referência {i+1} Contato", "Valor": ref["Contato"]})
+    data_for_excel.append({"Campo": "Observações", "Valor": dados_cliente["Observações"]})
+
+    df = pd.DataFrame(data_for_excel)
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name="Cadastro Cliente")
+    return output.getvalue()
+
+
+def celulas(xlsx):
+    planilha = load_workbook(BytesIO(xlsx)).active
+    return planilha.title, [tuple(linha) for linha in planilha.iter_rows(values_only=True)]
+
+
+def medir(funcao, repeticoes):
+    funcao()  # aquecimento: imports e caches fora da medição
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(tempos) * 1000, pico / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    antigo = celulas(exportar_pandas(ESTADO_EXEMPLO))
+    novo = celulas(exportar_ficha(ESTADO_EXEMPLO)["xlsx"])
+    if antigo != novo:
+        sys.exit(f"As planilhas diferem:\n  pandas:  {antigo}\n  esquema: {novo}")
+
+    caminhos = {
+        "pandas (DataFrame + ExcelWriter)": lambda: exportar_pandas(ESTADO_EXEMPLO),
+        "esquema, só xlsx": lambda: exportar_ficha(ESTADO_EXEMPLO),
+        "esquema, xlsx + csv + json": lambda: exportar_ficha(ESTADO_EXEMPLO, ("xlsx", "csv", "json")),
+    }
+    print(f"{'caminho':<34} {'mediana (ms)':>12} {'pico (KiB)':>11}")
+    for nome, funcao in caminhos.items():
+        ms, kib = medir(funcao, args.repeticoes)
+        print(f"{nome:<34} {ms:>12.2f} {kib:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
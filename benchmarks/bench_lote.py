@@ -0,0 +1,95 @@
+"""
+Mede o cadastro em lote (lote.py) com uma planilha .xlsx gerada, no modo --saida.
+
+Antes da medição, confere linha a linha a leitura da entrada: o tipo do documento deduzido
+quando a linha não traz "tipo_doc" (CNPJ numérico ou com letras em "documento", CNPJ só na
+coluna "cnpj") e os zeros à esquerda de CPF, CNPJ e CEP guardados como número no Excel.
+Todas as linhas geradas são válidas, então nenhuma pode ir para o relatório de rejeitadas.
+
+Uso:
+    python benchmarks/bench_lote.py [--linhas N] [--processos N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import xlsxwriter
+
+import lote
+
+COLUNAS = ("nome", "telefone", "tipo_doc", "documento", "cpf", "cnpj", "cliente_cep", "cliente_logradouro",
+           "cliente_numero", "cliente_bairro", "cliente_cidade", "cliente_estado")
+
+BASE = {"nome": "Clínica Veterinária Exemplo", "telefone": 8532345678, "cliente_cep": "60115170",
+        "cliente_logradouro": "Rua Exemplo", "cliente_numero": 100, "cliente_bairro": "Aldeota",
+        "cliente_cidade": "Fortaleza", "cliente_estado": "CE"}
+
+# (células da linha, tipo esperado, documento esperado, CEP esperado)
+CASOS = [
+    ({"documento": "11222333000181"}, "CNPJ", "11222333000181", "60115170"),
+    ({"cnpj": "11222333000181"}, "CNPJ", "11222333000181", "60115170"),
+    ({"documento": "12.ABC.345/01DE-35"}, "CNPJ", "12.ABC.345/01DE-35", "60115170"),
+    ({"cpf": 1234567890, "cliente_cep": 1310100}, "CPF", "01234567890", "01310100"),
+    ({"documento": 1234567890}, "CPF", "01234567890", "60115170"),
+    ({"tipo_doc": "CNPJ", "documento": 4252011000110}, "CNPJ", "04252011000110", "60115170"),
+    ({"cnpj": 4252011000110, "cliente_cep": 1310100}, "CNPJ", "04252011000110", "01310100"),
+]
+
+
+def gerar_planilha(caminho, linhas):
+    workbook = xlsxwriter.Workbook(caminho)
+    worksheet = workbook.add_worksheet()
+    worksheet.write_row(0, 0, COLUNAS)
+    for linha in range(1, linhas + 1):
+        celulas = dict(BASE, **CASOS[(linha - 1) % len(CASOS)][0])
+        for coluna, nome in enumerate(COLUNAS):
+            valor = celulas.get(nome)
+            if isinstance(valor, int):
+                worksheet.write_number(linha, coluna, valor)
+            elif valor:
+                worksheet.write_string(linha, coluna, valor)
+    workbook.close()
+
+
+def conferir_linhas(caminho):
+    # Linhas de planilhas sem a coluna "tipo_doc"
+    for celulas, tipo, documento, _ in CASOS[:3]:
+        estado = lote.estado_da_linha(celulas)
+        if (estado["tipo_doc_radio"], estado[lote.chave_documento(tipo)]) != (tipo, documento):
+            sys.exit(f"Linha {celulas} lida como {estado['tipo_doc_radio']}, esperado {tipo}")
+
+    for (numero, registro), (_, tipo, documento, cep) in zip(lote.ler_linhas(caminho), CASOS):
+        estado = lote.estado_da_linha(registro)
+        obtido = (estado["tipo_doc_radio"], estado[lote.chave_documento(estado["tipo_doc_radio"])],
+                  estado["cliente_cep_input"])
+        if obtido != (tipo, documento, cep):
+            sys.exit(f"Linha {numero} lida errado: {obtido}, esperado {(tipo, documento, cep)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=5_000)
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        entrada = os.path.join(pasta, "clientes.xlsx")
+        rejeitadas = os.path.join(pasta, "rejeitadas.csv")
+        gerar_planilha(entrada, max(args.linhas, len(CASOS)))
+        conferir_linhas(entrada)
+
+        lidas, geradas, recusadas, segundos = lote.executar(
+            entrada, os.path.join(pasta, "fichas"), caminho_rejeitadas=rejeitadas, processos=args.processos
+        )
+        if recusadas:
+            with open(rejeitadas, encoding="utf-8-sig") as arquivo:
+                sys.exit(f"{recusadas} linhas válidas foram rejeitadas:\n{arquivo.read(2000)}")
+    print(f"{lidas} linhas lidas, {geradas} fichas geradas em {segundos:.1f} s "
+          f"({lidas / segundos:,.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    main()
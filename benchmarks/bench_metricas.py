@@ -0,0 +1,74 @@
+"""
+Mede o custo da instrumentação opcional (metricas.py) por chamada, desativada e ativada, e o
+da exportação no formato do Prometheus com muitas sessões registradas.
+
+A instrumentação desativada deve custar uma fração de microssegundo por chamada: um rerun do
+cadastro leva dezenas de milissegundos e faz menos de dez chamadas.
+
+Uso:
+    python benchmarks/bench_metricas.py [--chamadas N] [--sessoes N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.pop("CADASTRO_METRICAS", None)
+os.environ.pop("CADASTRO_METRICAS_PORTA", None)
+
+import metricas
+from bench_reruns import FICHA_EXEMPLO
+
+
+def por_chamada_ns(funcao, chamadas):
+    inicio = time.perf_counter()
+    for _ in range(chamadas):
+        funcao()
+    return (time.perf_counter() - inicio) / chamadas * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chamadas", type=int, default=200_000)
+    parser.add_argument("--sessoes", type=int, default=1_000)
+    args = parser.parse_args()
+
+    ativas = metricas.Metricas()
+
+    def cronometro_desativado():
+        with metricas.cronometro("cadastro_rerun_segundos"):
+            pass
+
+    def cronometro_ativado():
+        with ativas.cronometro("cadastro_rerun_segundos"):
+            pass
+
+    medidas = {
+        "cronometro (desativado)": cronometro_desativado,
+        "contar (desativado)": lambda: metricas.contar("cadastro_reruns_total"),
+        "cronometro (ativado)": cronometro_ativado,
+        "contar com rótulo (ativado)": lambda: ativas.contar("cadastro_exportacoes_total", origem="rerun"),
+    }
+    for nome, funcao in medidas.items():
+        print(f"{nome:<30} {por_chamada_ns(funcao, args.chamadas):8.0f} ns")
+
+    estado = dict(FICHA_EXEMPLO, show_endereco_entrega=True, show_referencias=True, initialized=True)
+    inicio = time.perf_counter()
+    for _ in range(1_000):
+        tamanho = metricas.tamanho_estado(estado)
+    print(f"{'tamanho_estado (ficha cheia)':<30} {(time.perf_counter() - inicio) * 1e3:8.0f} µs "
+          f"({tamanho} bytes)")
+
+    for sessao in range(args.sessoes):
+        for _ in range(metricas.AMOSTRAGEM_SESSAO):
+            ativas.amostrar_sessao(str(sessao), lambda: tamanho)
+    inicio = time.perf_counter()
+    texto = ativas.texto()
+    print(f"{f'texto() com {args.sessoes} sessões':<30} {(time.perf_counter() - inicio) * 1e3:8.2f} ms "
+          f"({len(texto.splitlines())} linhas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Mede o índice de nomes de clientes (vendas.IndiceNomes) com um histórico de vendas sintético
+de milhões de linhas, no mesmo formato do df_vendas.csv.
+
+Mede o tempo para montar o índice a partir do CSV (uma vez por versão do arquivo), a memória
+alocada pelo índice e a latência das sugestões para consultas curtas, longas e sem resultado.
+
+Uso:
+    python benchmarks/bench_nomes.py [--linhas N] [--clientes N]
+"""
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vendas import IndiceNomes, contar_clientes
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PALAVRAS = ["HOSPITAL", "CLÍNICA", "FARMÁCIA", "INSTITUTO", "MATERNIDADE", "SÃO", "JOSÉ", "REGIONAL",
+            "CEARÁ", "CARIRI", "NORTE", "SUL", "SAÚDE", "VETERINÁRIA", "COMÉRCIO", "LTDA", "ME", "DISTRIBUIDORA"]
+
+
+def gerar_csv(caminho, linhas, clientes, rng, nomes=None):
+    """
+    Repete as linhas do df_vendas.csv trocando o cliente por um de `clientes` nomes sintéticos
+    (com frequência desigual, como no histórico real), ou por um dos `nomes` informados.
+    """
+    with open(os.path.join(RAIZ, "df_vendas.csv"), newline="", encoding="utf-8") as arquivo:
+        leitor = csv.reader(arquivo)
+        cabecalho = next(leitor)
+        modelo = list(leitor)
+    coluna = cabecalho.index("Cliente")
+    nomes = nomes or [" ".join(rng.sample(PALAVRAS, 3)) + f" {i}" for i in range(clientes)]
+    pesos = [1 / (i + 1) for i in range(len(nomes))]
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(cabecalho)
+        for inicio in range(0, linhas, 10_000):
+            escolhidos = rng.choices(nomes, weights=pesos, k=min(10_000, linhas - inicio))
+            for nome in escolhidos:
+                linha = list(rng.choice(modelo))
+                linha[coluna] = nome
+                escritor.writerow(linha)
+    return nomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=2_000_000)
+    parser.add_argument("--clientes", type=int, default=50_000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "df_vendas.csv")
+        nomes = gerar_csv(caminho, args.linhas, args.clientes, rng)
+        print(f"histórico: {args.linhas} linhas, {os.path.getsize(caminho) / 1024 / 1024:.0f} MB, "
+              f"{args.clientes} clientes")
+
+        inicio = time.perf_counter()
+        contagem = contar_clientes(caminho)
+        leitura = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        indice = IndiceNomes(contagem)
+        montagem = time.perf_counter() - inicio
+        tracemalloc.start()  # memória medida numa segunda montagem, para não atrasar a primeira
+        copia = IndiceNomes(contagem)
+        memoria, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del copia
+        print(f"leitura da coluna Cliente: {leitura:.1f} s; montagem do índice: {montagem:.1f} s "
+              f"({len(indice)} nomes, {memoria / 1024 / 1024:.1f} MB)")
+
+        consultas = {
+            "prefixo de 1 letra": ["h", "c", "f", "s"],
+            "prefixo de 8 letras": ["hospital", "clinica ", "farmacia", "institut"],
+            "meio do nome": ["cariri", "saude", "veterin", "regional norte"],
+            "nome completo": rng.sample(nomes, 4),
+            "sem resultado": ["xyzw", "empresa inexistente", "qqq", "zzzz zzzz"],
+        }
+        for nome, textos in consultas.items():
+            tempos = []
+            for _ in range(50):
+                for texto in textos:
+                    inicio = time.perf_counter()
+                    indice.sugerir(texto)
+                    tempos.append(time.perf_counter() - inicio)
+            print(f"{nome:<20} mediana {statistics.median(tempos) * 1000:7.3f} ms, "
+                  f"máx {max(tempos) * 1000:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
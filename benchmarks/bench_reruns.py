@@ -0,0 +1,123 @@
+"""
+Mede quantos reruns do script e quanto tempo de servidor custa preencher uma ficha completa.
+
+Simula um atendente preenchendo todos os campos (com Endereço de Entrega e Referências),
+e no fim clica em "Gerar e Baixar Ficha em Excel". Um widget fora de st.form dispara um
+rerun a cada edição; um widget dentro de um st.form só é enviado na submissão.
+
+Uso:
+    python benchmarks/bench_reruns.py [caminho/do/cadastro.py] [--fichas N]
+"""
+import argparse
+import os
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Campos digitados pelo atendente, na ordem em que aparecem na ficha.
+FICHA_EXEMPLO = {
+    "nome_input": "Clínica Veterinária Exemplo LTDA",
+    "fantasia_input": "Vet Exemplo",
+    "insc_estadual_input": "123456789",
+    "insc_municipal_input": "987654",
+    "email_input": "contato@vetexemplo.com.br",
+    "telefone_input": "8532345678",
+    "celular_input": "85999998888",
+    "cpf_input": "52998224725",
+    "cliente_cep_input": "60115170",
+    "cliente_logradouro_input": "Rua Exemplo",
+    "cliente_numero_input": "100",
+    "cliente_complemento_input": "Sala 2",
+    "cliente_bairro_input": "Aldeota",
+    "cliente_cidade_input": "Fortaleza",
+    "cliente_estado_input": "CE",
+    "entrega_cep_input": "60115170",
+    "entrega_rua_input": "Rua Exemplo",
+    "entrega_numero_input": "200",
+    "entrega_complemento_input": "",
+    "entrega_bairro_input": "Aldeota",
+    "entrega_cidade_input": "Fortaleza",
+    "entrega_estado_input": "CE",
+    "ref1_nome": "Fornecedor A",
+    "ref1_contato": "8530000000",
+    "ref2_nome": "Fornecedor B",
+    "ref2_contato": "8531111111",
+    "ref3_nome": "",
+    "ref3_contato": "",
+    "observacao_area": "Cliente indicado pelo representante.",
+}
+
+# As seções opcionais são abertas antes de começar a digitação.
+TOGGLES = ["show_endereco_entrega_checkbox", "show_referencias_checkbox"]
+
+
+def _widget(at, key):
+    for lista in (at.text_input, at.text_area, at.checkbox):
+        for w in lista:
+            if w.key == key:
+                return w
+    return None
+
+
+def _botao(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def preencher_ficha(script):
+    """Preenche uma ficha completa; retorna (reruns, segundos gastos no script)."""
+    at = AppTest.from_file(script, default_timeout=60)
+    reruns, gasto = 0, 0.0
+
+    def rerun():
+        nonlocal reruns, gasto
+        inicio = time.perf_counter()
+        at.run()
+        gasto += time.perf_counter() - inicio
+        reruns += 1
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    rerun()  # primeira renderização
+    for key in TOGGLES:
+        _widget(at, key).check()
+        rerun()
+    # Os campos fora do formulário ficam no topo da ficha e são preenchidos primeiro.
+    no_formulario = {key: bool(_widget(at, key).form_id) for key in FICHA_EXEMPLO}
+    for key in sorted(FICHA_EXEMPLO, key=no_formulario.get):
+        w = _widget(at, key)
+        w.set_value(FICHA_EXEMPLO[key])
+        if not w.form_id:
+            rerun()
+
+    _botao(at, "Gerar e Baixar Ficha em Excel").click()
+    rerun()
+    if not at.success:
+        raise RuntimeError("a ficha não foi gerada: " + "; ".join(e.value for e in at.error))
+    return reruns, gasto
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("script", nargs="?", default=os.path.join(RAIZ, "cadastro.py"))
+    parser.add_argument("--fichas", type=int, default=10, help="Número de fichas completas a simular.")
+    args = parser.parse_args()
+
+    # O app abre a logo por caminho relativo, então rodamos a partir da raiz do repositório.
+    os.chdir(RAIZ)
+    script = os.path.abspath(args.script)
+
+    resultados = [preencher_ficha(script) for _ in range(args.fichas)]
+    reruns = [r for r, _ in resultados]
+    tempos = [t * 1000 for _, t in resultados]
+    print(f"script: {script}")
+    print(f"fichas simuladas: {args.fichas}")
+    print(f"reruns por ficha: {statistics.mean(reruns):.0f}")
+    print(f"tempo de servidor por ficha: mediana {statistics.median(tempos):.1f} ms, "
+          f"média {statistics.mean(tempos):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
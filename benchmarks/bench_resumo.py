@@ -0,0 +1,96 @@
+"""
+Mede o resumo de vendas por cliente (vendas.ResumoVendas) com históricos sintéticos de
+tamanhos crescentes, no formato do df_vendas.csv.
+
+Para cada tamanho, mede:
+  - a montagem inicial do resumo (uma passada agrupada pelo arquivo inteiro);
+  - a consulta por cliente feita a cada rerun (atualizar() sem mudanças + buscar());
+  - a atualização depois de acrescentar linhas ao arquivo, comparada a refazer tudo do zero,
+    conferindo que as duas dão o mesmo resultado.
+
+Uso:
+    python benchmarks/bench_resumo.py [--linhas 10000 100000 1000000] [--acrescimo N]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_nomes import gerar_csv
+from vendas import ResumoVendas
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def arredondado(resumo):
+    # As somas em ponto flutuante mudam nos últimos dígitos conforme a ordem dos blocos
+    if resumo is None:
+        return None
+    return resumo._replace(valor_total=round(resumo.valor_total, 2), lucro_total=round(resumo.lucro_total, 2),
+                           prazo_medio=round(resumo.prazo_medio, 6), canceladas=round(resumo.canceladas, 6))
+
+
+def acrescentar(caminho, linhas, nomes, rng):
+    """
+    Acrescenta ao histórico `linhas` linhas novas (sem o cabeçalho) dos mesmos clientes, como
+    faria a exportação diária.
+    """
+    extra = caminho + ".extra"
+    gerar_csv(extra, linhas, len(nomes), rng, nomes)
+    with open(extra, "rb") as origem, open(caminho, "ab") as destino:
+        origem.readline()
+        destino.write(origem.read())
+    os.remove(extra)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--acrescimo", type=int, default=1_000, help="Linhas acrescentadas ao histórico.")
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    print(f"{'linhas':>9} {'montagem (s)':>12} {'consulta (µs)':>13} "
+          f"{'+' + str(args.acrescimo) + ' linhas (ms)':>20} {'refazer (s)':>11}")
+    with tempfile.TemporaryDirectory() as pasta:
+        for linhas in args.linhas:
+            caminho = os.path.join(pasta, f"vendas_{linhas}.csv")
+            nomes = gerar_csv(caminho, linhas, 5_000, rng)
+            resumo = ResumoVendas(caminho)
+            _, montagem = cronometrar(resumo.atualizar)
+
+            consultas = rng.sample(nomes, 200)
+            tempos = []
+            for nome in consultas:
+                inicio = time.perf_counter()
+                resumo.atualizar()
+                resumo.buscar(nome)
+                tempos.append(time.perf_counter() - inicio)
+
+            acrescentar(caminho, args.acrescimo, rng.sample(nomes, len(nomes)), rng)
+            _, incremental = cronometrar(resumo.atualizar)
+            do_zero = ResumoVendas(caminho)
+            _, refazer = cronometrar(do_zero.atualizar)
+            if resumo._resumos.keys() != do_zero._resumos.keys():
+                sys.exit("O resumo incremental e o refeito do zero têm clientes diferentes")
+            for nome in nomes:
+                incremental_nome, do_zero_nome = arredondado(resumo.buscar(nome)), arredondado(do_zero.buscar(nome))
+                if incremental_nome != do_zero_nome:
+                    sys.exit(f"Resumo incremental difere do refeito do zero para {nome}:\n"
+                             f"  {incremental_nome}\n  {do_zero_nome}")
+
+            print(f"{linhas:>9} {montagem:>12.2f} {statistics.median(tempos) * 1e6:>13.1f} "
+                  f"{incremental * 1000:>20.1f} {refazer:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark das regras de validação: versão escalar (um valor por chamada, como no
+formulário) contra a versão vetorial (coluna inteira, como no cadastro em lote).
+
+Também confere que as duas versões dão exatamente o mesmo resultado.
+
+Uso:
+    python benchmarks/bench_validacao.py [--linhas N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import validacao
+from validacao import _digito_verificador
+
+
+def gerar_cpf(rng):
+    numeros = [rng.randint(0, 9) for _ in range(9)]
+    numeros.append(_digito_verificador(numeros, validacao.PESOS_CPF_1))
+    numeros.append(_digito_verificador(numeros, validacao.PESOS_CPF_2))
+    cpf = "".join(map(str, numeros))
+    # Metade formatada, um quarto com um dígito trocado (inválido)
+    if rng.random() < 0.25:
+        cpf = cpf[:-1] + str((int(cpf[-1]) + 1) % 10)
+    return f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}" if rng.random() < 0.5 else cpf
+
+
+def gerar_cnpj(rng):
+    base = [rng.randint(0, 9) for _ in range(12)]
+    base.append(_digito_verificador(base, validacao.PESOS_CNPJ_1))
+    base.append(_digito_verificador(base, validacao.PESOS_CNPJ_2))
+    cnpj = "".join(map(str, base))
+    return cnpj if rng.random() < 0.75 else cnpj[:-1] + "0"
+
+
+GERADORES = {
+    "cpf": (validacao.cpf_valido, validacao.validar_cpfs, gerar_cpf),
+    "cnpj": (validacao.cnpj_valido, validacao.validar_cnpjs, gerar_cnpj),
+    "cep": (validacao.cep_valido, validacao.validar_ceps,
+            lambda rng: rng.choice(["60115-170", "60115170", "6011-170", "00000000"])),
+    "telefone": (validacao.telefone_valido, validacao.validar_telefones,
+                 lambda rng: rng.choice(["(85) 99999-8888", "+55 85 3234-5678", "0800123456", "859"])),
+    "uf": (validacao.uf_valida, validacao.validar_ufs, lambda rng: rng.choice(["CE", "sp", "XX", ""])),
+    "email": (validacao.email_valido, validacao.validar_emails,
+              lambda rng: rng.choice(["contato@vetexemplo.com.br", "x@y", "@a.com", "a.b@c.com"])),
+}
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100_000)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    validacao.validar_cpfs(["52998224725"])  # importa pandas/NumPy fora da medição
+    print(f"{args.linhas} valores por regra")
+    print(f"{'regra':<10} {'escalar (linhas/s)':>19} {'vetorial (linhas/s)':>20} {'ganho':>7}")
+    for nome, (escalar, vetorial, gerar) in GERADORES.items():
+        valores = [gerar(rng) for _ in range(args.linhas)]
+        esperado, t_escalar = cronometrar(lambda: [escalar(v) for v in valores])
+        obtido, t_vetorial = cronometrar(lambda: vetorial(valores))
+        if list(obtido) != esperado:
+            sys.exit(f"{nome}: as versões escalar e vetorial divergem")
+        print(f"{nome:<10} {args.linhas / t_escalar:>19,.0f} {args.linhas / t_vetorial:>20,.0f} "
+              f"{t_escalar / t_vetorial:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
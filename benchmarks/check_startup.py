@@ -0,0 +1,88 @@
+"""
+Verifica o orçamento de partida a frio do cadastro.py.
+
+Em processos Python novos, mede:
+  - o tempo de `import cadastro` (inclui o import do Streamlit) e se ele carregou alguma
+    dependência pesada que deveria ser importada só quando usada (DEPENDENCIAS_PESADAS:
+    pandas, NumPy e pyarrow da validação em lote e das vendas, xlsxwriter da exportação);
+  - a latência da primeira renderização do formulário em branco (AppTest).
+
+Termina com código 1 se a mediana de alguma medida passar do orçamento configurado.
+Os orçamentos também podem vir das variáveis de ambiente CADASTRO_ORCAMENTO_IMPORT_MS e
+CADASTRO_ORCAMENTO_RENDER_MS.
+
+Uso:
+    python benchmarks/check_startup.py [--execucoes N] [--orcamento-import-ms MS] [--orcamento-render-ms MS]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos pesados que `import cadastro` não pode carregar (são importados só quando usados)
+DEPENDENCIAS_PESADAS = ("pandas", "numpy", "pyarrow", "xlsxwriter")
+
+# Executado em um processo novo a cada medição, para que nenhum import já esteja em cache.
+MEDICAO = r"""
+import json, sys, time
+inicio = time.perf_counter()
+import cadastro
+import_s = time.perf_counter() - inicio
+carregadas = [m for m in sys.argv[1:] if m in sys.modules]
+
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(cadastro.__file__, default_timeout=120)
+inicio = time.perf_counter()
+at.run()
+render_s = time.perf_counter() - inicio
+erro = at.exception[0].message if at.exception else None
+print(json.dumps({"import_s": import_s, "render_s": render_s, "carregadas": carregadas, "erro": erro}))
+"""
+
+
+def medir_processo_novo():
+    saida = subprocess.run(
+        [sys.executable, "-c", MEDICAO, *DEPENDENCIAS_PESADAS], cwd=RAIZ, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--execucoes", type=int, default=5, help="Número de processos novos a medir.")
+    parser.add_argument("--orcamento-import-ms", type=float,
+                        default=float(os.environ.get("CADASTRO_ORCAMENTO_IMPORT_MS", 1500)))
+    parser.add_argument("--orcamento-render-ms", type=float,
+                        default=float(os.environ.get("CADASTRO_ORCAMENTO_RENDER_MS", 3000)))
+    args = parser.parse_args()
+
+    medicoes = [medir_processo_novo() for _ in range(args.execucoes)]
+    import_ms = statistics.median(m["import_s"] for m in medicoes) * 1000
+    render_ms = statistics.median(m["render_s"] for m in medicoes) * 1000
+
+    falhas = []
+    erros = {m["erro"] for m in medicoes if m["erro"]}
+    if erros:
+        falhas.append("a primeira renderização gerou exceção: " + "; ".join(erros))
+    carregadas = sorted({d for m in medicoes for d in m["carregadas"]})
+    if carregadas:
+        falhas.append(f"`import cadastro` carregou dependências pesadas: {', '.join(carregadas)}")
+    if import_ms > args.orcamento_import_ms:
+        falhas.append(f"import {import_ms:.0f} ms > orçamento {args.orcamento_import_ms:.0f} ms")
+    if render_ms > args.orcamento_render_ms:
+        falhas.append(f"primeira renderização {render_ms:.0f} ms > orçamento {args.orcamento_render_ms:.0f} ms")
+
+    print(f"processos medidos: {args.execucoes}")
+    print(f"import cadastro: mediana {import_ms:.0f} ms (orçamento {args.orcamento_import_ms:.0f} ms)")
+    print(f"primeira renderização: mediana {render_ms:.0f} ms (orçamento {args.orcamento_render_ms:.0f} ms)")
+    for falha in falhas:
+        print(f"FALHOU: {falha}")
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
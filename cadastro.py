@@ -1,6 +1,190 @@
+import importlib
+import os
+import threading
+import time
 import streamlit as st
-import pandas as pd
+from functools import partial
 from io import BytesIO
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import metricas
+from cep import CAMINHO_BASE as CAMINHO_BASE_CEP, BaseCep
+from ficha import (CAMPOS, FORMATOS, ArquivosGerados, campos_faltando, estado_ficha, exportar_ficha, nome_arquivo,
+                   valores_ficha)
+from registro import RegistroClientes
+from validacao import erros_ficha
+from vendas import CAMINHO_VENDAS, IndiceNomes, ResumoVendas
+
+# Dependências pesadas usadas apenas na exportação da ficha. Elas não são importadas no topo
+# do módulo para que um processo novo sirva o formulário em branco o mais rápido possível.
+DEPENDENCIAS_EXPORTACAO = ("xlsxwriter",)
+
+# Depois que a ficha é gerada, a sessão fica parada até o atendente baixar os arquivos (ou até
+# a aba ser fechada), com os arquivos guardados na memória do servidor (ArquivosGerados). Os
+# arquivos de uma sessão ociosa há mais de OCIOSIDADE_SESSAO segundos, cujo estado (campos +
+# arquivos) passe de LIMITE_SESSAO_BYTES, são descartados e refeitos se forem baixados depois.
+# Uma ficha típica ocupa uns 13 KB (3 KB de campos + 10 KB de xlsx/csv/json), então o limite
+# padrão libera os arquivos de toda sessão ociosa; aumente-o para manter os de fichas pequenas.
+LIMITE_SESSAO_BYTES = int(os.environ.get("CADASTRO_LIMITE_SESSAO", 8 * 1024))
+OCIOSIDADE_SESSAO = float(os.environ.get("CADASTRO_OCIOSIDADE_SESSAO", 120))
+
+LOGO_ARQUIVO = "Logo Veteagro.png"
+LOGO_LARGURA = 200  # Ajuste a largura conforme necessário
+
+# --- Logo da Empresa (carregada uma vez por processo) ---
+@st.cache_resource(show_spinner=False, max_entries=4)
+def carregar_logo(caminho, mtime, largura):
+    """
+    Lê a logo do disco e devolve os bytes de um PNG já reduzido para a largura exibida.
+    O mtime entra na chave do cache: se o arquivo for trocado, a logo é processada de novo.
+    """
+    from PIL import Image  # o Pillow já é dependência do Streamlit
+
+    with Image.open(caminho) as imagem:
+        altura = max(1, round(imagem.height * largura / imagem.width))
+        reduzida = imagem.resize((largura, altura), Image.LANCZOS)
+    output = BytesIO()
+    reduzida.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+def exibir_logo():
+    """
+    Exibe a logo a partir do cache em memória. Levanta FileNotFoundError se o arquivo não existir.
+    """
+    mtime = os.path.getmtime(LOGO_ARQUIVO)
+    st.image(carregar_logo(LOGO_ARQUIVO, mtime, LOGO_LARGURA), width=LOGO_LARGURA)
+
+# --- Pré-carregamento das Dependências de Exportação ---
+@st.cache_resource(show_spinner=False)
+def aquecer_dependencias():
+    """
+    Importa as dependências da exportação em segundo plano, uma única vez por processo,
+    depois que o formulário já foi renderizado. Assim a primeira exportação não paga o import.
+    """
+    def importar():
+        for modulo in DEPENDENCIAS_EXPORTACAO:
+            try:
+                importlib.import_module(modulo)
+            except ImportError:
+                # O erro será mostrado ao usuário na exportação, se a dependência faltar.
+                pass
+
+    thread = threading.Thread(target=importar, name="aquecer_dependencias", daemon=True)
+    thread.start()
+    return thread
+
+# --- Métricas do Processo (opcionais, ver metricas.py) ---
+@st.cache_resource(show_spinner=False)
+def iniciar_metricas():
+    """
+    Inicia a exportação das métricas (arquivo e/ou endpoint HTTP) uma única vez por processo.
+    """
+    return metricas.iniciar()
+
+def amostrar_sessao():
+    """
+    Conta o rerun desta sessão e, de tempos em tempos, mede o tamanho do seu st.session_state.
+    """
+    if not metricas.ATIVAS:
+        return
+    contexto = get_script_run_ctx()
+    if contexto is not None:
+        metricas.amostrar_sessao(contexto.session_id, lambda: metricas.tamanho_estado(st.session_state))
+
+# --- Registro Local de Clientes ---
+@st.cache_resource(show_spinner=False)
+def obter_registro():
+    """
+    Registro de clientes (SQLite) compartilhado por todas as sessões do processo.
+    """
+    return RegistroClientes()
+
+# --- Base de CEPs (busca de endereço sem rede) ---
+@st.cache_resource(show_spinner=False, max_entries=2)
+def carregar_base_cep(caminho, mtime):
+    """
+    Abre a base de CEPs compilada por cep.py, uma vez por processo. O arquivo é mapeado em
+    memória, então o processo não carrega a base inteira. O mtime entra na chave do cache:
+    se a base for recompilada, ela é reaberta.
+    """
+    return BaseCep(caminho)
+
+def obter_base_cep():
+    """
+    Base de CEPs do processo, ou None se ela ainda não foi compilada (a busca fica desabilitada).
+    """
+    try:
+        return carregar_base_cep(CAMINHO_BASE_CEP, os.path.getmtime(CAMINHO_BASE_CEP))
+    except (OSError, ValueError):
+        return None
+
+# --- Índice de Nomes do Histórico de Vendas ---
+@st.cache_resource(show_spinner="Indexando os clientes do histórico de vendas...", max_entries=1)
+def carregar_indice_nomes(caminho, mtime):
+    """
+    Índice de nomes de clientes do df_vendas.csv, montado uma vez por versão do arquivo e
+    compartilhado por todas as sessões. O mtime entra na chave do cache: quando o arquivo muda,
+    o índice é refeito (e o antigo é descartado, max_entries=1).
+    """
+    return IndiceNomes.do_arquivo(caminho)
+
+def obter_indice_nomes():
+    """
+    Índice de nomes do processo, ou None se o histórico de vendas não existir ou não puder ser lido.
+    """
+    try:
+        return carregar_indice_nomes(CAMINHO_VENDAS, os.path.getmtime(CAMINHO_VENDAS))
+    except (OSError, ValueError):
+        return None
+
+# --- Resumo de Vendas por Cliente ---
+@st.cache_resource(show_spinner=False)
+def obter_resumo_vendas():
+    """
+    Resumo de vendas por cliente compartilhado por todas as sessões. Não depende do mtime:
+    a cada rerun ele mesmo lê só as linhas acrescentadas ao df_vendas.csv (ResumoVendas.atualizar).
+    """
+    return ResumoVendas(CAMINHO_VENDAS)
+
+def formatar_reais(valor):
+    return "R$ " + f"{valor:,.2f}".translate(str.maketrans(",.", ".,"))
+
+def exibir_resumo_vendas(nome):
+    """
+    Painel lateral com o histórico de vendas do cliente digitado em Nome / Razão Social.
+    """
+    if not nome.strip():
+        return  # o histórico (e o pandas) só é carregado quando há um nome para buscar
+    resumo_vendas = obter_resumo_vendas()
+    try:
+        with st.spinner("Lendo o histórico de vendas..."):
+            resumo_vendas.atualizar()
+    except (OSError, ValueError):
+        return  # sem histórico de vendas, o painel não aparece
+
+    with st.sidebar:
+        st.header("📊 Histórico de Vendas")
+        resumo = resumo_vendas.buscar(nome)
+        if resumo is None:
+            st.caption("Nenhuma venda encontrada para este cliente.")
+            return
+        st.subheader(resumo.cliente)
+        col1, col2 = st.columns(2)
+        col1.metric("Total vendido", formatar_reais(resumo.valor_total))
+        col2.metric("Lucro", formatar_reais(resumo.lucro_total))
+        col1.metric("Notas fiscais", resumo.notas)
+        col2.metric("Última emissão", resumo.ultima_emissao.strftime("%d/%m/%Y") if resumo.ultima_emissao else "-")
+        col1.metric("Prazo médio", f"{resumo.prazo_medio:.0f} dias")
+        col2.metric("Notas canceladas", f"{resumo.canceladas:.0%}")
+        st.caption(f"Linha mais vendida: {resumo.linha_principal or '-'}. Os totais não incluem as notas canceladas.")
+
+# Campos preenchidos pela busca de CEP: campo do endereço -> chave do st.session_state
+CAMPOS_ENDERECO_CEP = {
+    "cliente": {"logradouro": "cliente_logradouro_input", "bairro": "cliente_bairro_input",
+                "cidade": "cliente_cidade_input", "estado": "cliente_estado_input"},
+    "entrega": {"logradouro": "entrega_rua_input", "bairro": "entrega_bairro_input",
+                "cidade": "entrega_cidade_input", "estado": "entrega_estado_input"},
+}
 
 # --- Função de Inicialização do Session State ---
 def initialize_session_state():
@@ -8,321 +192,407 @@ def initialize_session_state():
     Inicializa o st.session_state com valores padrão para limpar o formulário.
     """
     if "initialized" not in st.session_state:
-        # Informações Pessoais/Empresariais
-        st.session_state.nome_input = ""
-        st.session_state.fantasia_input = ""
-        st.session_state.insc_estadual_input = ""
-        st.session_state.insc_municipal_input = ""
-        st.session_state.email_input = ""
-        st.session_state.telefone_input = ""
-        st.session_state.celular_input = ""
-        st.session_state.tipo_doc_radio = "CPF"
-        st.session_state.cpf_input = ""
-        st.session_state.cnpj_input = ""
-
-        # Endereço do Cliente (Principal)
-        st.session_state.cliente_cep_input = ""
-        st.session_state.cliente_logradouro_input = ""
-        st.session_state.cliente_numero_input = ""
-        st.session_state.cliente_complemento_input = ""
-        st.session_state.cliente_bairro_input = ""
-        st.session_state.cliente_cidade_input = ""
-        st.session_state.cliente_estado_input = ""
+        # Campos da ficha (nome, documentos, endereços, referências, observações...)
+        for campo in CAMPOS:
+            st.session_state[campo.chave] = campo.padrao
 
         # Controles para mostrar/ocultar seções
         st.session_state.show_endereco_entrega = False
         st.session_state.show_referencias = False
 
-        # Endereço de Entrega
-        st.session_state.entrega_cep_input = ""
-        st.session_state.entrega_rua_input = ""
-        st.session_state.entrega_numero_input = ""
-        st.session_state.entrega_complemento_input = ""
-        st.session_state.entrega_bairro_input = ""
-        st.session_state.entrega_cidade_input = ""
-        st.session_state.entrega_estado_input = ""
-
-        # Documentos para Entrega
-        st.session_state.doc_contrato_social = False
-        st.session_state.doc_comprovante_endereco = False
-
-        # Referências
-        st.session_state.ref1_nome = ""
-        st.session_state.ref1_contato = ""
-        st.session_state.ref2_nome = ""
-        st.session_state.ref2_contato = ""
-        st.session_state.ref3_nome = ""
-        st.session_state.ref3_contato = ""
-
-        # Observações
-        st.session_state.observacao_area = ""
-
         st.session_state.initialized = True
 
+# --- Campos das Seções Opcionais Ocultas ---
+# Checkbox que mostra cada seção opcional do esquema (ficha.SECOES_OPCIONAIS)
+CHECKBOX_SECOES = {"entrega": "show_endereco_entrega_checkbox", "referencias": "show_referencias_checkbox"}
+
+def manter_secoes_ocultas():
+    """
+    O Streamlit descarta o valor dos widgets que não são desenhados num rerun. Enquanto uma seção
+    opcional está oculta, seus campos são reatribuídos ao st.session_state como valores comuns,
+    que sobrevivem: desmarcar e marcar de novo a seção devolve o que já tinha sido digitado.
+    Seções visíveis não são tocadas, para não sobrescrever a digitação ainda não enviada do formulário.
+    """
+    ocultas = {secao for secao, checkbox in CHECKBOX_SECOES.items() if not st.session_state.get(checkbox, False)}
+    for campo in CAMPOS:
+        if campo.secao in ocultas and campo.chave in st.session_state:
+            st.session_state[campo.chave] = st.session_state[campo.chave]
+
 # --- Função para Limpar os Campos ---
 def clear_form():
     """
     Reseta todos os valores no st.session_state para limpar os campos do formulário.
     """
-    for key in st.session_state.keys():
-        # Exclui as chaves de controle de visibilidade da limpeza para que elas permaneçam False
-        if key in ["show_endereco_entrega", "show_referencias", "initialized"]:
-            continue
-        if (key.endswith('_input') or key.endswith('_area') or
-            key.endswith('_nome') or key.endswith('_contato')):
-            if key == "tipo_doc_radio":
-                st.session_state[key] = "CPF"
-            else:
-                st.session_state[key] = ""
-        elif key.startswith('doc_'):
-            st.session_state[key] = False
-    
+    for campo in CAMPOS:
+        st.session_state[campo.chave] = campo.padrao
+
     # Resetar os controles de visibilidade explicitamente para False ao limpar
     st.session_state.show_endereco_entrega = False
     st.session_state.show_referencias = False
-    
-    st.rerun()
+    st.session_state.show_endereco_entrega_checkbox = False
+    st.session_state.show_referencias_checkbox = False
+    # Não é preciso chamar st.rerun(): como clear_form é usado como callback (on_click),
+    # o Streamlit já executa o script novamente logo após a limpeza.
+
+# --- Função para Carregar um Cliente Já Cadastrado ---
+def carregar_cliente(documento):
+    """
+    Preenche o st.session_state com os dados do cliente salvo no registro local.
+    """
+    valores = obter_registro().carregar(documento)
+    if valores is None:
+        return
+    for campo in CAMPOS:
+        st.session_state[campo.chave] = valores.get(campo.chave, campo.padrao)
+
+    # Abre as seções opcionais que o cliente tem cadastradas
+    tem_entrega = any(chave.startswith("entrega_") for chave in valores)
+    tem_referencias = any(chave.startswith("ref") and valores[chave] for chave in valores)
+    st.session_state.show_endereco_entrega = st.session_state.show_endereco_entrega_checkbox = tem_entrega
+    st.session_state.show_referencias = st.session_state.show_referencias_checkbox = tem_referencias
+
+# --- Função para Usar um Nome Sugerido ---
+def usar_sugestao_nome():
+    """
+    Copia o nome escolhido entre as sugestões para o campo Nome / Razão Social.
+    """
+    if st.session_state.sugestao_nome:
+        st.session_state.nome_input = st.session_state.sugestao_nome
+    st.session_state.sugestao_nome = None
+
+# --- Função para Preencher o Endereço pelo CEP ---
+def preencher_endereco(prefixo):
+    """
+    Preenche logradouro, bairro, cidade e estado a partir do CEP digitado ("cliente" ou "entrega").
+    Só os campos vazios são preenchidos: os que já têm outro valor (corrigido à mão, por exemplo)
+    são mantidos e oferecidos ao atendente, que decide se os substitui (substituir_endereco).
+    """
+    cep = st.session_state[f"{prefixo}_cep_input"]
+    if not cep.strip():
+        return
+    base_cep = obter_base_cep()
+    endereco = base_cep.buscar(cep) if base_cep else None
+    if endereco is None:
+        st.session_state[f"{prefixo}_cep_nao_encontrado"] = True
+        return
+    st.session_state[f"{prefixo}_cep_input"] = endereco.cep
+    divergentes = {}
+    for campo, chave in CAMPOS_ENDERECO_CEP[prefixo].items():
+        valor = getattr(endereco, campo)
+        # CEPs gerais (cidades de CEP único) não têm logradouro nem bairro: mantém o que foi digitado
+        if not valor:
+            continue
+        atual = st.session_state.get(chave, "").strip()
+        if not atual:
+            st.session_state[chave] = valor
+        elif atual.casefold() != valor.casefold():
+            divergentes[chave] = valor
+    if divergentes:
+        st.session_state[f"{prefixo}_cep_divergentes"] = divergentes
+
+def substituir_endereco(divergentes):
+    """
+    Troca os campos já preenchidos pelos valores da base de CEPs que o atendente confirmou.
+    """
+    for chave, valor in divergentes.items():
+        st.session_state[chave] = valor
+
+def campo_cep(prefixo, rotulo, ajuda, base_cep):
+    """
+    Campo de CEP e, se a base de CEPs existir, o botão que preenche o restante do endereço.
+    """
+    chave = f"{prefixo}_cep_input"
+    if base_cep is None:
+        st.text_input(rotulo, max_chars=9, help=ajuda, key=chave)
+        return
+    col_cep, col_buscar = st.columns([3, 1], vertical_alignment="bottom")
+    with col_cep:
+        st.text_input(rotulo, max_chars=9, help=ajuda, key=chave)
+    with col_buscar:
+        # Dentro do st.form só botões de envio aceitam callback; o envio também guarda o que já foi digitado
+        st.form_submit_button("🔎 Buscar CEP", use_container_width=True, key=f"{prefixo}_buscar_cep_button",
+                              on_click=preencher_endereco, args=(prefixo,))
+    if st.session_state.pop(f"{prefixo}_cep_nao_encontrado", False):
+        st.warning("CEP não encontrado na base local. Preencha o endereço manualmente.")
+    divergentes = st.session_state.pop(f"{prefixo}_cep_divergentes", None)
+    if divergentes:
+        campos = {chave: campo for campo, chave in CAMPOS_ENDERECO_CEP[prefixo].items()}
+        st.info("Os campos já preenchidos foram mantidos. Endereço deste CEP na base: "
+                + "; ".join(f"{campos[chave].capitalize()}: {valor}" for chave, valor in divergentes.items()) + ".")
+        # Os valores vão nos args do callback, então o botão vale só para a busca que o mostrou
+        st.form_submit_button("Substituir pelo endereço do CEP", key=f"{prefixo}_substituir_endereco_button",
+                              on_click=substituir_endereco, args=(divergentes,))
+
+# --- Arquivos da Ficha para Download ---
+@st.cache_resource(show_spinner=False)
+def obter_arquivos_gerados():
+    """
+    Arquivos gerados de todas as sessões, com uma thread que libera os das sessões ociosas.
+    """
+    gerados = ArquivosGerados()
+
+    def liberar_periodicamente():
+        while True:
+            time.sleep(min(OCIOSIDADE_SESSAO, 60))
+            arquivos, tamanho = gerados.liberar_ociosos(OCIOSIDADE_SESSAO, LIMITE_SESSAO_BYTES)
+            if arquivos:
+                metricas.contar("cadastro_arquivos_liberados_total", arquivos)
+                metricas.contar("cadastro_arquivos_liberados_bytes_total", tamanho)
+
+    threading.Thread(target=liberar_periodicamente, name="liberar_arquivos_ociosos", daemon=True).start()
+    return gerados
+
+def descartar_arquivos_sessao():
+    """
+    Um rerun tira da tela os botões de download do rerun anterior: os arquivos deles já não são necessários.
+    """
+    contexto = get_script_run_ctx()
+    if contexto is not None:
+        obter_arquivos_gerados().descartar(contexto.session_id)
+
+def baixar_arquivo(gerados, sessao, estado, formato):
+    """
+    Chamada pelo Streamlit no clique de download, fora do script (por isso não usa o
+    st.session_state): entrega o arquivo guardado ou, se ele já foi liberado, o refaz a partir
+    da cópia dos campos (estado_ficha).
+    """
+    dados = gerados.obter(sessao, formato)
+    if dados is None:
+        with metricas.cronometro("cadastro_exportacao_segundos", origem="download"):
+            dados = exportar_ficha(estado, formatos=(formato,))[formato]
+        metricas.contar("cadastro_exportacoes_total", origem="download")
+    return dados
+
+def dados_download(arquivos):
+    """
+    Dados para os botões de download: guarda os arquivos desta sessão em ArquivosGerados e
+    devolve, por formato, a função que o Streamlit chama no clique (download sob demanda).
+    """
+    contexto = get_script_run_ctx()
+    if contexto is None:
+        return arquivos  # sem o runtime (python cadastro.py) não há download sob demanda
+    tamanho_estado = metricas.tamanho_estado(st.session_state)
+    metricas.registrar_sessao(contexto.session_id, tamanho_estado + sum(len(dados) for dados in arquivos.values()))
+    gerados = obter_arquivos_gerados()
+    gerados.guardar(contexto.session_id, arquivos, tamanho_estado)
+    estado = estado_ficha(st.session_state)
+    return {formato: partial(baixar_arquivo, gerados, contexto.session_id, estado, formato) for formato in arquivos}
+
+# --- Erros de Validação por Campo ---
+def mostrar_erro(erros, chave):
+    """
+    Mostra, logo abaixo do campo, o erro de validação dele (se houver).
+    """
+    if chave in erros:
+        st.error(erros[chave], icon="🚨")
 
 # --- Aplicação Streamlit Principal ---
 def app():
     # Inicializa o estado da sessão na primeira execução
     initialize_session_state()
+    manter_secoes_ocultas()
+    descartar_arquivos_sessao()
 
     st.set_page_config(page_title="Ficha de Cadastro de Cliente", layout="centered")
 
     # --- Logo da Empresa ---
     try:
-        st.image("Logo Veteagro.png", width=200) # Ajuste a largura conforme necessário
+        exibir_logo()
     except FileNotFoundError:
-        st.warning("A logo 'Logo Veteagro.png' não foi encontrada. Certifique-se de que está no mesmo diretório do script.")
+        st.warning(f"A logo '{LOGO_ARQUIVO}' não foi encontrada. Certifique-se de que está no mesmo diretório do script.")
     except Exception as e:
         st.warning(f"Erro ao carregar a logo: {e}")
 
     st.title("📝 Ficha de Cadastro de Cliente")
     st.write("Preencha os dados do cliente para gerar e baixar a ficha em Excel. Use o botão 'Limpar Cadastro' para reiniciar o formulário.")
 
-    # --- Seção: Informações Principais do Cliente ---
-    st.header("Informações Pessoais/Empresariais")
-    nome = st.text_input("Nome / Razão Social*", value=st.session_state.nome_input, help="Nome completo do cliente ou razão social da empresa.", key="nome_input")
-    fantasia = st.text_input("Nome Fantasia (Opcional)", value=st.session_state.fantasia_input, help="Nome fantasia da empresa, se aplicável.", key="fantasia_input")
-    insc_estadual = st.text_input("Inscrição Estadual (Opcional)", value=st.session_state.insc_estadual_input, max_chars=14, help="Número de inscrição estadual da empresa (somente números).", key="insc_estadual_input")
-    insc_municipal = st.text_input("Inscrição Municipal (Opcional)", value=st.session_state.insc_municipal_input, max_chars=14, help="Número de inscrição municipal da empresa (somente números).", key="insc_municipal_input")
-    email = st.text_input("Email (Opcional)", value=st.session_state.email_input, help="Email de contato do cliente.", key="email_input")
-    telefone = st.text_input("Telefone*", value=st.session_state.telefone_input, max_chars=15, help="Número de telefone do cliente (somente números).", key="telefone_input")
-    celular = st.text_input("Celular (Opcional)", value=st.session_state.celular_input, max_chars=15, help="Número de celular do cliente (somente números).", key="celular_input")
-
+    # --- Validação de Formato ---
+    # O documento é validado assim que é digitado; os demais campos, quando a ficha é enviada.
+    with metricas.cronometro("cadastro_validacao_segundos"):
+        erros = erros_ficha(st.session_state)
+    ficha_enviada = st.session_state.get("gerar_ficha_button", False)
+    erros_visiveis = erros if ficha_enviada else {chave: erro for chave, erro in erros.items() if chave in ("cpf_input", "cnpj_input")}
+
+    # --- Controles da Ficha (fora do formulário) ---
+    # Estes controles alteram quais campos aparecem, por isso ficam fora do st.form:
+    # cada mudança provoca um rerun, enquanto a digitação dentro do formulário só
+    # é enviada ao servidor quando a ficha é submetida.
+    st.header("Opções da Ficha")
     tipo_documento = st.radio("Tipo de Documento*", ["CPF", "CNPJ"], horizontal=True, key="tipo_doc_radio")
-    documento = ""
+    # O documento fica fora do formulário para que a busca no registro aconteça assim que ele é digitado
     if tipo_documento == "CPF":
-        documento = st.text_input("CPF*", value=st.session_state.cpf_input, max_chars=14, help="Digite o CPF do cliente (somente números).", key="cpf_input")
+        documento = st.text_input("CPF*", max_chars=14, help="Digite o CPF do cliente (somente números).", key="cpf_input")
     else:
-        documento = st.text_input("CNPJ*", value=st.session_state.cnpj_input, max_chars=18, help="Digite o CNPJ da empresa (somente números).", key="cnpj_input")
-
-    # --- Endereço do Cliente ---
-    st.markdown("---")
-    st.header("Endereço do Cliente (Sede/Principal)")
-    st.write("Preencha os dados do endereço principal do cliente. Os campos marcados com * são obrigatórios.")
-
-    cliente_cep = st.text_input("CEP*", value=st.session_state.cliente_cep_input, max_chars=9, help="Digite o CEP do cliente (somente números).", key="cliente_cep_input")
-    cliente_logradouro = st.text_input("Logradouro*", value=st.session_state.cliente_logradouro_input, help="Nome do logradouro.", key="cliente_logradouro_input")
-    cliente_numero = st.text_input("Número*", value=st.session_state.cliente_numero_input, help="Número do imóvel.", key="cliente_numero_input")
-    cliente_complemento = st.text_input("Complemento", value=st.session_state.cliente_complemento_input, help="Ex: Apartamento, Bloco, Sala.", key="cliente_complemento_input")
-    cliente_bairro = st.text_input("Bairro*", value=st.session_state.cliente_bairro_input, help="Nome do bairro.", key="cliente_bairro_input")
-    cliente_cidade = st.text_input("Cidade*", value=st.session_state.cliente_cidade_input, help="Nome da cidade.", key="cliente_cidade_input")
-    cliente_estado = st.text_input("Estado*", value=st.session_state.cliente_estado_input, help="Ex: CE, SP, MG", key="cliente_estado_input").upper()
-
-    # --- Opção para Endereço de Entrega ---
-    st.markdown("---")
-    st.session_state.show_endereco_entrega = st.checkbox("Cadastrar Endereço de Entrega (se diferente do principal)", value=st.session_state.show_endereco_entrega, key="show_endereco_entrega_checkbox")
-
-    if st.session_state.show_endereco_entrega:
-        st.header("Endereço de Entrega")
-        # Removido o asterisco e a menção de "obrigatórios" aqui, pois não serão validados
-        st.write("Preencha o endereço de entrega (opcional).") 
-
-        # Os campos de texto aqui não têm asterisco para indicar que não são obrigatórios
-        entrega_cep = st.text_input("CEP Entrega", value=st.session_state.entrega_cep_input, max_chars=9, help="Código de Endereçamento Postal (somente números).", key="entrega_cep_input")
-        entrega_rua = st.text_input("Rua/Avenida Entrega", value=st.session_state.entrega_rua_input, help="Nome da rua ou avenida.", key="entrega_rua_input")
-        entrega_numero = st.text_input("Número Entrega", value=st.session_state.entrega_numero_input, help="Número do imóvel.", key="entrega_numero_input")
-        entrega_complemento = st.text_input("Complemento Entrega", value=st.session_state.entrega_complemento_input, help="Ex: Apartamento, Bloco, Sala.", key="entrega_complemento_input")
-        entrega_bairro = st.text_input("Bairro Entrega", value=st.session_state.entrega_bairro_input, help="Nome do bairro.", key="entrega_bairro_input")
-        entrega_cidade = st.text_input("Cidade Entrega", value=st.session_state.entrega_cidade_input, help="Nome da cidade.", key="entrega_cidade_input")
-        entrega_estado = st.text_input("Estado Entrega", value=st.session_state.entrega_estado_input, help="Ex: CE, SP, MG", key="entrega_estado_input").upper()
-    else:
-        # Se a seção não for exibida, garantimos que as variáveis tenham valores vazios
-        entrega_cep, entrega_rua, entrega_numero, entrega_complemento, entrega_bairro, entrega_cidade, entrega_estado = ("", "", "", "", "", "", "")
-
-
-    # --- Seção: Documentos para Entrega ---
-    st.header("Documentos para Entrega")
-    st.write("Marque os documentos que foram entregues junto com a ficha de cadastro.")
-    doc_contrato_social = st.checkbox("Contrato Social", value=st.session_state.doc_contrato_social, key="doc_contrato_social")
-    doc_comprovante_endereco = st.checkbox("Comprovante de Endereço (conta de água ou energia)", value=st.session_state.doc_comprovante_endereco, key="doc_comprovante_endereco")
-
-
-    # --- Opção para Referências ---
-    st.markdown("---")
-    st.session_state.show_referencias = st.checkbox("Cadastrar Referências", value=st.session_state.show_referencias, key="show_referencias_checkbox")
-
-    if st.session_state.show_referencias:
-        st.header("Referências")
-        st.write("Forneça até 3 referências (pessoas ou empresas que possam atestar sobre o cliente). Os campos são opcionais.") # Adicionado "opcionais"
-        referencia1_nome = st.text_input("Nome Referência 1", value=st.session_state.ref1_nome, key="ref1_nome")
-        referencia1_contato = st.text_input("Contato Referência 1 (Telefone/Email)", value=st.session_state.ref1_contato, key="ref1_contato")
-        referencia2_nome = st.text_input("Nome Referência 2", value=st.session_state.ref2_nome, key="ref2_nome")
-        referencia2_contato = st.text_input("Contato Referência 2 (Telefone/Email)", value=st.session_state.ref2_contato, key="ref2_contato")
-        referencia3_nome = st.text_input("Nome Referência 3", value=st.session_state.ref3_nome, key="ref3_nome")
-        referencia3_contato = st.text_input("Contato Referência 3 (Telefone/Email)", value=st.session_state.ref3_contato, key="ref3_contato")
-    else:
-        # Se a seção não for exibida, garantimos que as variáveis tenham valores vazios
-        referencia1_nome, referencia1_contato = ("", "")
-        referencia2_nome, referencia2_contato = ("", "")
-        referencia3_nome, referencia3_contato = ("", "")
-
-
-    # --- Seção: Campo de Observação ---
-    st.header("Observações")
-    observacao = st.text_area("Observações Adicionais", value=st.session_state.observacao_area, height=150, help="Qualquer informação extra relevante sobre o cliente.", key="observacao_area")
-
-    # --- Botões de Ação ---
-    st.markdown("---")
-    col1, col2 = st.columns(2)
-
-    with col1:
-        if st.button("Gerar e Baixar Ficha em Excel", type="primary", use_container_width=True):
-            # --- Validação dos Campos Obrigatórios (APENAS os principais) ---
-            if not (nome and documento and telefone and cliente_cep and cliente_logradouro and
-                    cliente_numero and cliente_bairro and cliente_cidade and cliente_estado):
-                st.error("🚨 Por favor, preencha todos os campos obrigatórios (marcados com *) da seção 'Informações Pessoais/Empresariais' e 'Endereço do Cliente (Sede/Principal)'.")
-            else:
-                # --- Coleta e Organização dos Dados ---
-                dados_cliente = {
-                    "Nome/Razão Social": nome,
-                    "Nome Fantasia": fantasia if fantasia else "Não informado",
-                    "Inscrição Estadual": insc_estadual if insc_estadual else "Não informado",
-                    "Inscrição Municipal": insc_municipal if insc_municipal else "Não informado",
-                    "Email": email if email else "Não informado",
-                    "Telefone": telefone,
-                    "Celular": celular if celular else "Não informado",
-                    "Tipo Documento": tipo_documento,
-                    "Documento": documento,
-                    "Endereço do Cliente (Principal)": {
-                        "CEP": cliente_cep,
-                        "Logradouro": cliente_logradouro,
-                        "Número": cliente_numero,
-                        "Complemento": cliente_complemento if cliente_complemento else "Não informado",
-                        "Bairro": cliente_bairro,
-                        "Cidade": cliente_cidade,
-                        "Estado": cliente_estado
-                    },
-                    "Endereço de Entrega (Opcional)": {}, # Inicializa vazio
-                    "Documentos Entregues": {
-                        "Contrato Social": "Sim" if doc_contrato_social else "Não",
-                        "Comprovante de Endereço": "Sim" if doc_comprovante_endereco else "Não"
-                    },
-                    "Referências": [], # Inicializa vazio
-                    "Observações": observacao if observacao else "Nenhuma observação."
-                }
-
-                # Preenche Endereço de Entrega se for cadastrado (campos podem ser vazios)
-                if st.session_state.show_endereco_entrega:
-                    dados_cliente["Endereço de Entrega (Opcional)"] = {
-                        "CEP": entrega_cep if entrega_cep else "Não informado",
-                        "Rua/Avenida": entrega_rua if entrega_rua else "Não informado",
-                        "Número": entrega_numero if entrega_numero else "Não informado",
-                        "Complemento": entrega_complemento if entrega_complemento else "Não informado",
-                        "Bairro": entrega_bairro if entrega_bairro else "Não informado",
-                        "Cidade": entrega_cidade if entrega_cidade else "Não informado",
-                        "Estado": entrega_estado if entrega_estado else "Não informado"
-                    }
-                else: # Se não for para cadastrar, preenche com "Não informado"
-                     dados_cliente["Endereço de Entrega (Opcional)"] = {
-                        "CEP": "Não informado", "Rua/Avenida": "Não informado", "Número": "Não informado",
-                        "Complemento": "Não informado", "Bairro": "Não informado", "Cidade": "Não informado",
-                        "Estado": "Não informado"
-                    }
-
-                # Preenche Referências se for cadastrado (campos podem ser vazios)
-                if st.session_state.show_referencias:
-                    # Adiciona referências apenas se o nome ou contato for preenchido
-                    if referencia1_nome or referencia1_contato:
-                        dados_cliente["Referências"].append({"Nome": referencia1_nome if referencia1_nome else "Não informado", "Contato": referencia1_contato if referencia1_contato else "Não informado"})
-                    if referencia2_nome or referencia2_contato:
-                        dados_cliente["Referências"].append({"Nome": referencia2_nome if referencia2_nome else "Não informado", "Contato": referencia2_contato if referencia2_contato else "Não informado"})
-                    if referencia3_nome or referencia3_contato:
-                        dados_cliente["Referências"].append({"Nome": referencia3_nome if referencia3_nome else "Não informado", "Contato": referencia3_contato if referencia3_contato else "Não informado"})
-                    
-                    # Se a opção foi marcada, mas nenhuma referência foi adicionada, adicione uma linha "Não informado"
-                    if not dados_cliente["Referências"]:
-                        dados_cliente["Referências"].append({"Nome": "Não informado", "Contato": "Não informado"})
-                else: # Se não for para cadastrar, preenche com "Não informado"
-                    dados_cliente["Referências"].append({"Nome": "Não informado", "Contato": "Não informado"})
-
-
-                # --- Geração e Download do Arquivo Excel ---
-                st.success("✅ Ficha preenchida com sucesso! Agora você pode baixar o arquivo Excel.")
-                st.write("---")
-                st.subheader("📥 Baixar Ficha em Excel")
-
-                # Preparar os dados para o DataFrame do Pandas
-                data_for_excel = [
-                    {"Campo": "Nome/Razão Social", "Valor": dados_cliente['Nome/Razão Social']},
-                    {"Campo": "Nome Fantasia", "Valor": dados_cliente['Nome Fantasia']},
-                    {"Campo": "Inscrição Estadual", "Valor": dados_cliente['Inscrição Estadual']},
-                    {"Campo": "Inscrição Municipal", "Valor": dados_cliente['Inscrição Municipal']},
-                    {"Campo": "Email", "Valor": dados_cliente['Email']},
-                    {"Campo": "Telefone", "Valor": dados_cliente['Telefone']},
-                    {"Campo": "Celular", "Valor": dados_cliente['Celular']},
-                    {"Campo": "Tipo Documento", "Valor": dados_cliente['Tipo Documento']},
-                    {"Campo": "Documento", "Valor": dados_cliente['Documento']},
-                    # Campos do Endereço do Cliente (Principal)
-                    {"Campo": "Endereço Principal - CEP", "Valor": dados_cliente['Endereço do Cliente (Principal)']['CEP']},
-                    {"Campo": "Endereço Principal - Logradouro", "Valor": dados_cliente['Endereço do Cliente (Principal)']['Logradouro']},
-                    {"Campo": "Endereço Principal - Número", "Valor": dados_cliente['Endereço do Cliente (Principal)']['Número']},
-                    {"Campo": "Endereço Principal - Complemento", "Valor": dados_cliente['Endereço do Cliente (Principal)']['Complemento']},
-                    {"Campo": "Endereço Principal - Bairro", "Valor": dados_cliente['Endereço do Cliente (Principal)']['Bairro']},
-                    {"Campo": "Endereço Principal - Cidade", "Valor": dados_cliente['Endereço do Cliente (Principal)']['Cidade']},
-                    {"Campo": "Endereço Principal - Estado", "Valor": dados_cliente['Endereço do Cliente (Principal)']['Estado']},
-                    # Campos do Endereço de Entrega
-                    {"Campo": "Endereço Entrega - CEP", "Valor": dados_cliente['Endereço de Entrega (Opcional)']['CEP']},
-                    {"Campo": "Endereço Entrega - Rua/Avenida", "Valor": dados_cliente['Endereço de Entrega (Opcional)']['Rua/Avenida']},
-                    {"Campo": "Endereço Entrega - Número", "Valor": dados_cliente['Endereço de Entrega (Opcional)']['Número']},
-                    {"Campo": "Endereço Entrega - Complemento", "Valor": dados_cliente['Endereço de Entrega (Opcional)']['Complemento']},
-                    {"Campo": "Endereço Entrega - Bairro", "Valor": dados_cliente['Endereço de Entrega (Opcional)']['Bairro']},
-                    {"Campo": "Endereço Entrega - Cidade", "Valor": dados_cliente['Endereço de Entrega (Opcional)']['Cidade']},
-                    {"Campo": "Endereço Entrega - Estado", "Valor": dados_cliente['Endereço de Entrega (Opcional)']['Estado']},
-
-                    {"Campo": "Documento: Contrato Social Entregue?", "Valor": dados_cliente['Documentos Entregues']['Contrato Social']},
-                    {"Campo": "Documento: Comprovante de Endereço Entregue?", "Valor": dados_cliente['Documentos Entregues']['Comprovante de Endereço']}
-                ]
-
-                # Adiciona referências ao data_for_excel
-                for i, ref in enumerate(dados_cliente["Referências"]):
-                    data_for_excel.append({"Campo": f"Referência {i+1} Nome", "Valor": ref['Nome']})
-                    data_for_excel.append({"Campo": f"Referência {i+1} Contato", "Valor": ref['Contato']})
-                
-                data_for_excel.append({"Campo": "Observações", "Valor": dados_cliente['Observações']})
-
-                df = pd.DataFrame(data_for_excel)
-
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    df.to_excel(writer, index=False, sheet_name='Cadastro Cliente')
-                processed_data = output.getvalue()
+        documento = st.text_input("CNPJ*", max_chars=18, help="Digite o CNPJ da empresa (somente números).", key="cnpj_input")
+    mostrar_erro(erros_visiveis, "cpf_input" if tipo_documento == "CPF" else "cnpj_input")
 
+    cliente_existente = obter_registro().buscar_resumo(documento) if documento else None
+    if cliente_existente:
+        st.warning(f"⚠️ Já existe um cliente cadastrado com este {tipo_documento}: {cliente_existente[1]}. Gerar a ficha atualizará o cadastro existente.")
+        st.button("Carregar cliente existente", on_click=carregar_cliente, args=(documento,))
+
+    st.session_state.show_endereco_entrega = st.checkbox("Cadastrar Endereço de Entrega (se diferente do principal)", key="show_endereco_entrega_checkbox")
+    st.session_state.show_referencias = st.checkbox("Cadastrar Referências", key="show_referencias_checkbox")
+
+    # --- Seção: Informações Principais do Cliente ---
+    st.header("Informações Pessoais/Empresariais")
+    # O nome também fica fora do formulário, para sugerir clientes do histórico de vendas
+    nome = st.text_input("Nome / Razão Social*", help="Nome completo do cliente ou razão social da empresa.", key="nome_input")
+    indice_nomes = obter_indice_nomes() if nome.strip() else None
+    if indice_nomes is not None and nome not in indice_nomes:
+        sugestoes = indice_nomes.sugerir(nome)
+        if sugestoes:
+            st.pills("Clientes do histórico de vendas", sugestoes, key="sugestao_nome", on_change=usar_sugestao_nome)
+    exibir_resumo_vendas(nome)
+
+    base_cep = obter_base_cep()
+    # Enter dentro de um campo não envia o formulário: o envio seria o do primeiro botão (Buscar CEP
+    # ou Gerar Ficha), no meio da digitação
+    with st.form("ficha_form", border=False, enter_to_submit=False):
+        st.text_input("Nome Fantasia (Opcional)", help="Nome fantasia da empresa, se aplicável.", key="fantasia_input")
+        st.text_input("Inscrição Estadual (Opcional)", max_chars=14, help="Número de inscrição estadual da empresa (somente números).", key="insc_estadual_input")
+        st.text_input("Inscrição Municipal (Opcional)", max_chars=14, help="Número de inscrição municipal da empresa (somente números).", key="insc_municipal_input")
+        st.text_input("Email (Opcional)", help="Email de contato do cliente.", key="email_input")
+        mostrar_erro(erros_visiveis, "email_input")
+        st.text_input("Telefone*", max_chars=15, help="Número de telefone do cliente (somente números).", key="telefone_input")
+        mostrar_erro(erros_visiveis, "telefone_input")
+        st.text_input("Celular (Opcional)", max_chars=15, help="Número de celular do cliente (somente números).", key="celular_input")
+        mostrar_erro(erros_visiveis, "celular_input")
+
+        # --- Endereço do Cliente ---
+        st.markdown("---")
+        st.header("Endereço do Cliente (Sede/Principal)")
+        st.write("Preencha os dados do endereço principal do cliente. Os campos marcados com * são obrigatórios.")
+
+        campo_cep("cliente", "CEP*", "Digite o CEP do cliente (somente números).", base_cep)
+        mostrar_erro(erros_visiveis, "cliente_cep_input")
+        st.text_input("Logradouro*", help="Nome do logradouro.", key="cliente_logradouro_input")
+        st.text_input("Número*", help="Número do imóvel.", key="cliente_numero_input")
+        st.text_input("Complemento", help="Ex: Apartamento, Bloco, Sala.", key="cliente_complemento_input")
+        st.text_input("Bairro*", help="Nome do bairro.", key="cliente_bairro_input")
+        st.text_input("Cidade*", help="Nome da cidade.", key="cliente_cidade_input")
+        st.text_input("Estado*", help="Ex: CE, SP, MG", key="cliente_estado_input")
+        mostrar_erro(erros_visiveis, "cliente_estado_input")
+
+        # --- Endereço de Entrega (Opcional) ---
+        if st.session_state.show_endereco_entrega:
+            st.markdown("---")
+            st.header("Endereço de Entrega")
+            # Removido o asterisco e a menção de "obrigatórios" aqui, pois não serão validados
+            st.write("Preencha o endereço de entrega (opcional).")
+
+            # Os campos de texto aqui não têm asterisco para indicar que não são obrigatórios
+            campo_cep("entrega", "CEP Entrega", "Código de Endereçamento Postal (somente números).", base_cep)
+            mostrar_erro(erros_visiveis, "entrega_cep_input")
+            st.text_input("Rua/Avenida Entrega", help="Nome da rua ou avenida.", key="entrega_rua_input")
+            st.text_input("Número Entrega", help="Número do imóvel.", key="entrega_numero_input")
+            st.text_input("Complemento Entrega", help="Ex: Apartamento, Bloco, Sala.", key="entrega_complemento_input")
+            st.text_input("Bairro Entrega", help="Nome do bairro.", key="entrega_bairro_input")
+            st.text_input("Cidade Entrega", help="Nome da cidade.", key="entrega_cidade_input")
+            st.text_input("Estado Entrega", help="Ex: CE, SP, MG", key="entrega_estado_input")
+            mostrar_erro(erros_visiveis, "entrega_estado_input")
+
+        # --- Seção: Documentos para Entrega ---
+        st.markdown("---")
+        st.header("Documentos para Entrega")
+        st.write("Marque os documentos que foram entregues junto com a ficha de cadastro.")
+        st.checkbox("Contrato Social", key="doc_contrato_social")
+        st.checkbox("Comprovante de Endereço (conta de água ou energia)", key="doc_comprovante_endereco")
+
+        # --- Referências (Opcional) ---
+        if st.session_state.show_referencias:
+            st.markdown("---")
+            st.header("Referências")
+            st.write("Forneça até 3 referências (pessoas ou empresas que possam atestar sobre o cliente). Os campos são opcionais.") # Adicionado "opcionais"
+            st.text_input("Nome Referência 1", key="ref1_nome")
+            st.text_input("Contato Referência 1 (Telefone/Email)", key="ref1_contato")
+            st.text_input("Nome Referência 2", key="ref2_nome")
+            st.text_input("Contato Referência 2 (Telefone/Email)", key="ref2_contato")
+            st.text_input("Nome Referência 3", key="ref3_nome")
+            st.text_input("Contato Referência 3 (Telefone/Email)", key="ref3_contato")
+
+        # --- Seção: Campo de Observação ---
+        st.header("Observações")
+        st.text_area("Observações Adicionais", height=150, help="Qualquer informação extra relevante sobre o cliente.", key="observacao_area")
+
+        # --- Botões de Ação ---
+        st.markdown("---")
+        col1, col2 = st.columns(2)
+
+        with col1:
+            gerar_ficha = st.form_submit_button("Gerar e Baixar Ficha em Excel", type="primary", use_container_width=True, key="gerar_ficha_button")
+
+        with col2:
+            # Botão para limpar o formulário
+            st.form_submit_button("Limpar Cadastro", type="secondary", use_container_width=True, on_click=clear_form)
+
+    # --- Geração da Ficha (fora do formulário, pois st.download_button não pode ficar dentro de um st.form) ---
+    if gerar_ficha:
+        # --- Validação dos Campos Obrigatórios (APENAS os principais) ---
+        if campos_faltando(st.session_state):
+            metricas.contar("cadastro_falhas_validacao_total", motivo="obrigatorios")
+            st.error("🚨 Por favor, preencha todos os campos obrigatórios (marcados com *) da seção 'Informações Pessoais/Empresariais' e 'Endereço do Cliente (Sede/Principal)'.")
+        elif erros:
+            metricas.contar("cadastro_falhas_validacao_total", motivo="formato")
+            st.error("🚨 Há campos com formato inválido. Corrija os campos indicados acima para gerar a ficha.")
+        else:
+            # --- Geração e Download da Ficha ---
+            st.success("✅ Ficha preenchida com sucesso! Agora você pode baixar o arquivo Excel.")
+            st.write("---")
+            st.subheader("📥 Baixar Ficha em Excel")
+
+            # Uma única passada pelos campos do esquema gera as três saídas (xlsx, csv e json)
+            with metricas.cronometro("cadastro_exportacao_segundos", origem="rerun"):
+                arquivos = exportar_ficha(st.session_state, formatos=tuple(FORMATOS))
+            metricas.contar("cadastro_exportacoes_total", origem="rerun")
+            arquivos = dados_download(arquivos)
+
+            st.download_button(
+                label="Clique para Baixar Ficha em Excel",
+                data=arquivos["xlsx"],
+                file_name=nome_arquivo(st.session_state, "xlsx"),
+                mime=FORMATOS["xlsx"],
+                on_click="ignore",  # baixar o arquivo não precisa de um novo rerun
+                help="Baixa um arquivo Excel (.xlsx) com os dados preenchidos."
+            )
+            col_csv, col_json = st.columns(2)
+            with col_csv:
+                st.download_button(
+                    label="Baixar em CSV",
+                    data=arquivos["csv"],
+                    file_name=nome_arquivo(st.session_state, "csv"),
+                    mime=FORMATOS["csv"],
+                    use_container_width=True,
+                    on_click="ignore",
+                    help="Baixa a ficha em CSV (Campo, Valor)."
+                )
+            with col_json:
                 st.download_button(
-                    label="Clique para Baixar Ficha em Excel",
-                    data=processed_data,
-                    file_name=f"cadastro_cliente_{dados_cliente['Nome/Razão Social'].replace(' ', '_').lower()}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    help="Baixa um arquivo Excel (.xlsx) com os dados preenchidos."
+                    label="Baixar em JSON",
+                    data=arquivos["json"],
+                    file_name=nome_arquivo(st.session_state, "json"),
+                    mime=FORMATOS["json"],
+                    use_container_width=True,
+                    on_click="ignore",
+                    help="Baixa a ficha em JSON ({Campo: Valor})."
                 )
 
-    with col2:
-        # Botão para limpar o formulário
-        if st.button("Limpar Cadastro", type="secondary", use_container_width=True, on_click=clear_form):
-            pass
+            # --- Gravação no Registro Local ---
+            try:
+                novo = obter_registro().salvar(valores_ficha(st.session_state))
+            except Exception as e:
+                st.warning(f"A ficha foi gerada, mas não foi possível salvar o cliente no registro local: {e}")
+            else:
+                st.info("💾 Cliente salvo no registro local." if novo else "💾 Cadastro do cliente atualizado no registro local.")
+
+    # Com o formulário já enviado ao navegador, pré-carrega o xlsxwriter em segundo plano.
+    aquecer_dependencias()
 
 # --- Execução da Aplicação ---
 if __name__ == "__main__":
-    app()
\ No newline at end of file
+    if metricas.ATIVAS:
+        iniciar_metricas()
+    with metricas.cronometro("cadastro_rerun_segundos"):
+        app()
+    metricas.contar("cadastro_reruns_total")
+    amostrar_sessao()
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Busca de endereço pelo CEP, sem acesso à rede.
+
+A base de CEPs (CSV ou XLSX com as colunas cep, logradouro, bairro, cidade e estado/uf) é
+compilada uma única vez para um arquivo binário ordenado. O app abre esse arquivo com mmap e
+faz busca binária direto nele: as páginas ficam no cache do sistema operacional, compartilhadas
+por todas as sessões e processos, e cada processo só guarda um pequeno cache LRU das consultas.
+
+Uso:
+    python cep.py compilar ceps.csv [--saida ceps.bin]
+    python cep.py buscar 60115-170
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+
+from validacao import normalizar_uf, somente_digitos
+
+CAMINHO_BASE = os.environ.get("CADASTRO_CEP", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ceps.bin"))
+
+# --- Formato do Arquivo (little-endian) ---
+#   cabeçalho  MAGICO, versão, quantidade de CEPs, início dos textos
+#   ceps       quantidade x uint32, em ordem crescente (busca binária)
+#   registros  quantidade x (logradouro, bairro, cidade: posição no bloco de textos; UF: 2 bytes)
+#   textos     strings UTF-8 terminadas em \0, cada uma gravada uma única vez
+#              (bairros e cidades se repetem em milhares de CEPs)
+MAGICO = b"CEP\0"
+VERSAO = 1
+CABECALHO = struct.Struct("<4sIII")
+REGISTRO = struct.Struct("<III2s")
+
+Endereco = namedtuple("Endereco", "cep logradouro bairro cidade estado")
+
+# Nome de coluna aceito (em minúsculas) -> campo do endereço
+COLUNAS = {
+    "cep": "cep",
+    "logradouro": "logradouro", "rua": "logradouro", "endereco": "logradouro", "endereço": "logradouro",
+    "bairro": "bairro",
+    "cidade": "cidade", "localidade": "cidade", "municipio": "cidade", "município": "cidade",
+    "estado": "estado", "uf": "estado",
+}
+
+def formatar_cep(numero):
+    texto = f"{numero:08d}"
+    return f"{texto[:5]}-{texto[5:]}"
+
+# --- Compilação ---
+def compilar(entrada, saida=CAMINHO_BASE):
+    """
+    Gera o arquivo binário a partir da planilha de CEPs e retorna a quantidade de CEPs gravados.
+    Linhas com CEP inválido são ignoradas; CEPs repetidos ficam com a última linha.
+    """
+    from lote import ler_linhas
+
+    enderecos = {}
+    for _, registro in ler_linhas(entrada):
+        linha = {COLUNAS.get((coluna or "").strip().lower()): (valor or "").strip() for coluna, valor in registro.items()}
+        digitos = somente_digitos(linha.get("cep"))
+        if len(digitos) != 8:
+            continue
+        enderecos[int(digitos)] = (linha.get("logradouro", ""), linha.get("bairro", ""), linha.get("cidade", ""),
+                                   normalizar_uf(linha.get("estado"))[:2])
+
+    ceps = array("I", sorted(enderecos))
+    textos = bytearray()
+    posicoes = {}
+
+    def posicao(texto):
+        if texto not in posicoes:
+            posicoes[texto] = len(textos)
+            textos.extend(texto.encode("utf-8") + b"\0")
+        return posicoes[texto]
+
+    registros = bytearray()
+    for numero in ceps:
+        logradouro, bairro, cidade, uf = enderecos[numero]
+        registros += REGISTRO.pack(posicao(logradouro), posicao(bairro), posicao(cidade), uf.encode("ascii", "replace"))
+
+    if sys.byteorder == "big":
+        ceps.byteswap()
+    inicio_textos = CABECALHO.size + len(ceps) * 4 + len(registros)
+
+    # Grava em um arquivo temporário e troca de uma vez: processos com a base antiga já mapeada
+    # continuam lendo o arquivo antigo até reabrirem.
+    temporario = f"{saida}.tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(CABECALHO.pack(MAGICO, VERSAO, len(ceps), inicio_textos))
+        arquivo.write(ceps.tobytes())
+        arquivo.write(registros)
+        arquivo.write(textos)
+    os.replace(temporario, saida)
+    return len(ceps)
+
+# --- Consulta ---
+class BaseCep:
+    """
+    Consulta à base compilada, mapeada em memória (somente leitura). Pode ser compartilhada
+    entre threads; na frente do arquivo fica um cache LRU com os CEPs consultados recentemente.
+    """
+
+    def __init__(self, caminho=CAMINHO_BASE, tamanho_cache=4096):
+        with open(caminho, "rb") as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, versao, quantidade, self._inicio_textos = CABECALHO.unpack_from(self._mapa)
+        if magico != MAGICO or versao != VERSAO:
+            self._mapa.close()
+            raise ValueError(f"'{caminho}' não é uma base de CEPs compilada por cep.py (versão {VERSAO}).")
+
+        inicio_ceps = CABECALHO.size
+        self._inicio_registros = inicio_ceps + quantidade * 4
+        if sys.byteorder == "little":
+            # A coluna de CEPs é lida direto do mmap, sem cópia
+            self._ceps = memoryview(self._mapa)[inicio_ceps:self._inicio_registros].cast("I")
+        else:
+            self._ceps = array("I", self._mapa[inicio_ceps:self._inicio_registros])
+            self._ceps.byteswap()
+        self._consultar = lru_cache(maxsize=tamanho_cache)(self._consultar_arquivo)
+
+    def __len__(self):
+        return len(self._ceps)
+
+    def buscar(self, cep):
+        """
+        Retorna o Endereco do CEP (com ou sem hífen), ou None se ele não estiver na base.
+        """
+        digitos = somente_digitos(cep)
+        if len(digitos) != 8:
+            return None
+        return self._consultar(int(digitos))
+
+    def _consultar_arquivo(self, numero):
+        i = bisect_left(self._ceps, numero)
+        if i == len(self._ceps) or self._ceps[i] != numero:
+            return None
+        logradouro, bairro, cidade, uf = REGISTRO.unpack_from(self._mapa, self._inicio_registros + i * REGISTRO.size)
+        return Endereco(formatar_cep(numero), self._texto(logradouro), self._texto(bairro), self._texto(cidade),
+                        uf.rstrip(b"\0").decode("ascii"))
+
+    def _texto(self, posicao):
+        inicio = self._inicio_textos + posicao
+        return self._mapa[inicio:self._mapa.find(b"\0", inicio)].decode("utf-8")
+
+    def close(self):
+        if isinstance(self._ceps, memoryview):
+            self._ceps.release()
+        self._mapa.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    compilacao = comandos.add_parser("compilar", help="Compila a planilha de CEPs para o arquivo binário.")
+    compilacao.add_argument("entrada", help="Planilha de CEPs (.csv ou .xlsx).")
+    compilacao.add_argument("--saida", default=CAMINHO_BASE, help=f"Arquivo gerado (padrão: {CAMINHO_BASE}).")
+    busca = comandos.add_parser("buscar", help="Consulta um CEP na base compilada.")
+    busca.add_argument("cep")
+    busca.add_argument("--base", default=CAMINHO_BASE)
+    args = parser.parse_args(argv)
+
+    if args.comando == "compilar":
+        quantidade = compilar(args.entrada, args.saida)
+        print(f"{quantidade} CEPs gravados em {args.saida} ({os.path.getsize(args.saida) / 1024 / 1024:.1f} MB).")
+        return 0
+
+    base = BaseCep(args.base)
+    endereco = base.buscar(args.cep)
+    if endereco is None:
+        print(f"CEP {args.cep} não encontrado.")
+        return 1
+    print(", ".join(parte for parte in endereco if parte))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+import csv
+import io
+import json
+import threading
+import time
+from collections import namedtuple
+from itertools import groupby
+
+# --- Esquema da Ficha de Cadastro ---
+# Cada campo da ficha é declarado uma única vez aqui. O esquema define a inicialização e a
+# limpeza do st.session_state, a validação dos obrigatórios e a ordem das linhas exportadas.
+#
+#   chave       -> chave do widget no st.session_state
+#   rotulo      -> nome do campo na ficha exportada (coluna "Campo")
+#   secao       -> seção que controla se o campo está ativo (None = sempre ativo)
+#   obrigatorio -> se o campo precisa estar preenchido para gerar a ficha
+#   padrao      -> valor inicial/limpo do widget
+#   vazio       -> texto exportado quando o campo está vazio ou a seção não foi cadastrada
+#   maiusculo   -> se o valor é exportado em maiúsculas (UF)
+Campo = namedtuple("Campo", "chave rotulo secao obrigatorio padrao vazio maiusculo")
+Campo.__new__.__defaults__ = (None, False, "", "Não informado", False)
+
+NAO_INFORMADO = "Não informado"
+
+CAMPOS = (
+    # Informações Pessoais/Empresariais
+    Campo("nome_input", "Nome/Razão Social", obrigatorio=True),
+    Campo("fantasia_input", "Nome Fantasia"),
+    Campo("insc_estadual_input", "Inscrição Estadual"),
+    Campo("insc_municipal_input", "Inscrição Municipal"),
+    Campo("email_input", "Email"),
+    Campo("telefone_input", "Telefone", obrigatorio=True),
+    Campo("celular_input", "Celular"),
+    Campo("tipo_doc_radio", "Tipo Documento", obrigatorio=True, padrao="CPF"),
+    # Só um dos dois documentos fica ativo, conforme o Tipo de Documento escolhido
+    Campo("cpf_input", "Documento", secao="cpf", obrigatorio=True),
+    Campo("cnpj_input", "Documento", secao="cnpj", obrigatorio=True),
+
+    # Endereço do Cliente (Principal)
+    Campo("cliente_cep_input", "Endereço Principal - CEP", obrigatorio=True),
+    Campo("cliente_logradouro_input", "Endereço Principal - Logradouro", obrigatorio=True),
+    Campo("cliente_numero_input", "Endereço Principal - Número", obrigatorio=True),
+    Campo("cliente_complemento_input", "Endereço Principal - Complemento"),
+    Campo("cliente_bairro_input", "Endereço Principal - Bairro", obrigatorio=True),
+    Campo("cliente_cidade_input", "Endereço Principal - Cidade", obrigatorio=True),
+    Campo("cliente_estado_input", "Endereço Principal - Estado", obrigatorio=True, maiusculo=True),
+
+    # Endereço de Entrega (Opcional)
+    Campo("entrega_cep_input", "Endereço Entrega - CEP", secao="entrega"),
+    Campo("entrega_rua_input", "Endereço Entrega - Rua/Avenida", secao="entrega"),
+    Campo("entrega_numero_input", "Endereço Entrega - Número", secao="entrega"),
+    Campo("entrega_complemento_input", "Endereço Entrega - Complemento", secao="entrega"),
+    Campo("entrega_bairro_input", "Endereço Entrega - Bairro", secao="entrega"),
+    Campo("entrega_cidade_input", "Endereço Entrega - Cidade", secao="entrega"),
+    Campo("entrega_estado_input", "Endereço Entrega - Estado", secao="entrega", maiusculo=True),
+
+    # Documentos para Entrega
+    Campo("doc_contrato_social", "Documento: Contrato Social Entregue?", padrao=False),
+    Campo("doc_comprovante_endereco", "Documento: Comprovante de Endereço Entregue?", padrao=False),
+
+    # Referências (até 3 pares Nome/Contato, renumerados na exportação)
+    Campo("ref1_nome", "Nome", secao="referencias"),
+    Campo("ref1_contato", "Contato", secao="referencias"),
+    Campo("ref2_nome", "Nome", secao="referencias"),
+    Campo("ref2_contato", "Contato", secao="referencias"),
+    Campo("ref3_nome", "Nome", secao="referencias"),
+    Campo("ref3_contato", "Contato", secao="referencias"),
+
+    # Observações
+    Campo("observacao_area", "Observações", vazio="Nenhuma observação."),
+)
+
+CAMPOS_POR_CHAVE = {campo.chave: campo for campo in CAMPOS}
+
+# Chaves do st.session_state que mostram/ocultam as seções opcionais
+SECOES_OPCIONAIS = {"entrega": "show_endereco_entrega", "referencias": "show_referencias"}
+
+CABECALHO = ("Campo", "Valor")
+NOME_PLANILHA = "Cadastro Cliente"
+
+FORMATOS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "json": "application/json",
+}
+
+# --- Funções do Esquema ---
+def secao_ativa(secao, estado):
+    """
+    Indica se uma seção está ativa para o estado informado (st.session_state ou dict).
+    """
+    if secao is None:
+        return True
+    if secao in ("cpf", "cnpj"):
+        return estado.get("tipo_doc_radio", "CPF") == secao.upper()
+    return bool(estado.get(SECOES_OPCIONAIS[secao], False))
+
+def valor_campo(campo, estado):
+    """
+    Valor atual do campo, já sem espaços nas bordas (ou vazio, se a seção estiver inativa).
+    """
+    if not secao_ativa(campo.secao, estado):
+        return campo.padrao
+    valor = estado.get(campo.chave, campo.padrao)
+    if isinstance(valor, str):
+        valor = valor.strip()
+        if campo.maiusculo:
+            valor = valor.upper()
+    return valor
+
+def valores_ficha(estado):
+    """
+    Valores dos campos ativos da ficha, por chave do st.session_state (campos de seções
+    inativas ficam de fora).
+    """
+    return {campo.chave: valor_campo(campo, estado) for campo in CAMPOS if secao_ativa(campo.secao, estado)}
+
+def estado_ficha(estado):
+    """
+    Cópia (dict) das chaves do st.session_state de que a exportação precisa: os campos e as
+    chaves das seções opcionais. Permite refazer os arquivos fora do script, sem a sessão.
+    """
+    chaves = [campo.chave for campo in CAMPOS] + list(SECOES_OPCIONAIS.values())
+    return {chave: estado[chave] for chave in chaves if chave in estado}
+
+def chave_documento(tipo_documento):
+    """
+    Chave do st.session_state que guarda o documento do tipo informado ("CPF" ou "CNPJ").
+    """
+    return "cnpj_input" if tipo_documento == "CNPJ" else "cpf_input"
+
+def campos_faltando(estado):
+    """
+    Retorna os campos obrigatórios (ativos) que não foram preenchidos.
+    """
+    return [campo for campo in CAMPOS
+            if campo.obrigatorio and secao_ativa(campo.secao, estado) and not valor_campo(campo, estado)]
+
+def linhas_ficha(estado):
+    """
+    Gera os pares (Campo, Valor) da ficha, na ordem do esquema.
+    """
+    for eh_referencia, grupo in groupby(CAMPOS, key=lambda campo: campo.secao == "referencias"):
+        if eh_referencia:
+            yield from _linhas_referencias([valor_campo(campo, estado) for campo in grupo])
+            continue
+        for campo in grupo:
+            # CPF e CNPJ ocupam a mesma linha "Documento": exporta apenas o que está ativo
+            if campo.secao in ("cpf", "cnpj") and not secao_ativa(campo.secao, estado):
+                continue
+            valor = valor_campo(campo, estado)
+            if isinstance(valor, bool):
+                valor = "Sim" if valor else "Não"
+            yield campo.rotulo, valor or campo.vazio
+
+def _linhas_referencias(valores):
+    """
+    Renumera as referências preenchidas (nome ou contato); sem nenhuma, exporta uma linha "Não informado".
+    """
+    pares = [(nome, contato) for nome, contato in zip(valores[0::2], valores[1::2]) if nome or contato]
+    if not pares:
+        pares = [("", "")]
+    for i, (nome, contato) in enumerate(pares):
+        yield f"Referência {i+1} Nome", nome or NAO_INFORMADO
+        yield f"Referência {i+1} Contato", contato or NAO_INFORMADO
+
+# --- Exportação da Ficha ---
+def exportar_ficha(estado, formatos=("xlsx",)):
+    """
+    Percorre as linhas da ficha uma única vez, escrevendo cada uma diretamente em todos os
+    formatos pedidos ("xlsx", "csv", "json"). Retorna um dict {formato: bytes}.
+    """
+    escritores = [_escritor(formato) for formato in formatos]
+    for escritor in escritores:
+        next(escritor)
+    for linha in linhas_ficha(estado):
+        for escritor in escritores:
+            escritor.send(linha)
+
+    saidas = {}
+    for formato, escritor in zip(formatos, escritores):
+        try:
+            escritor.send(None)
+        except StopIteration as fim:
+            saidas[formato] = fim.value
+    return saidas
+
+def _escritor(formato):
+    if formato == "xlsx":
+        return _escrever_xlsx()
+    if formato == "csv":
+        return _escrever_csv()
+    if formato == "json":
+        return _escrever_json()
+    raise ValueError(f"Formato de exportação desconhecido: {formato}")
+
+def formato_cabecalho(workbook):
+    """
+    Formato do cabeçalho (Campo, Valor): o mesmo estilo que o pandas aplicava no to_excel.
+    """
+    return workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+
+def adicionar_aba(workbook, nome=NOME_PLANILHA, cabecalho=None):
+    """
+    Cria uma aba da ficha com a linha de cabeçalho já escrita.
+    """
+    worksheet = workbook.add_worksheet(nome)
+    worksheet.write_row(0, 0, CABECALHO, cabecalho or formato_cabecalho(workbook))
+    return worksheet
+
+def escrever_linha(worksheet, numero, linha):
+    """
+    Escreve um par (Campo, Valor) na linha `numero` da aba.
+    """
+    # write_string evita que valores como "=..." ou "http://..." virem fórmulas ou links
+    worksheet.write_string(numero, 0, linha[0])
+    worksheet.write_string(numero, 1, str(linha[1]))
+
+def _escrever_xlsx():
+    """
+    Corrotina que grava as linhas recebidas direto na planilha, sem DataFrame intermediário.
+    """
+    import xlsxwriter  # importado sob demanda; veja cadastro.aquecer_dependencias()
+
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"in_memory": True})
+    worksheet = adicionar_aba(workbook)
+
+    linha = yield
+    numero = 1
+    while linha is not None:
+        escrever_linha(worksheet, numero, linha)
+        numero += 1
+        linha = yield
+    workbook.close()
+    return output.getvalue()
+
+def _celula_csv(valor):
+    # Como o write_string do xlsx: o Excel executaria "=...", "+...", "-..." e "@..." como fórmula
+    valor = str(valor)
+    return f"'{valor}" if valor.startswith(("=", "+", "-", "@", "\t", "\r")) else valor
+
+def _escrever_csv():
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CABECALHO)
+    linha = yield
+    while linha is not None:
+        writer.writerow([_celula_csv(valor) for valor in linha])
+        linha = yield
+    # BOM para o Excel reconhecer o UTF-8 dos acentos
+    return output.getvalue().encode("utf-8-sig")
+
+def _escrever_json():
+    dados = {}
+    linha = yield
+    while linha is not None:
+        dados[linha[0]] = linha[1]
+        linha = yield
+    return json.dumps(dados, ensure_ascii=False, indent=2).encode("utf-8")
+
+def nome_arquivo(estado, formato):
+    """
+    Nome do arquivo para download, no padrão cadastro_cliente_<nome>.<formato>.
+    """
+    nome = valor_campo(CAMPOS_POR_CHAVE["nome_input"], estado)
+    return f"cadastro_cliente_{nome.replace(' ', '_').lower()}.{formato}"
+
+# --- Arquivos Gerados, Guardados por Sessão ---
+class ArquivosGerados:
+    """
+    Arquivos da ficha gerados em cada sessão, guardados até o download. Uma instância por
+    processo, compartilhada entre as sessões.
+
+    liberar_ociosos() descarta os arquivos das sessões paradas há mais que `ociosidade`
+    segundos cujo estado (campos + arquivos) passa de `limite` bytes, e os de qualquer sessão
+    parada há mais que `expiracao` (a sessão pode ter sido fechada). obter() devolve None para
+    um arquivo descartado, e quem baixa o refaz a partir de uma cópia dos campos (estado_ficha).
+    """
+
+    def __init__(self, agora=time.monotonic):
+        self._agora = agora
+        self._trava = threading.Lock()
+        self._sessoes = {}  # sessão -> (instante da geração, bytes do estado + arquivos, {formato: bytes})
+
+    def guardar(self, sessao, arquivos, tamanho_estado=0):
+        tamanho = tamanho_estado + sum(len(dados) for dados in arquivos.values())
+        with self._trava:
+            self._sessoes[sessao] = (self._agora(), tamanho, dict(arquivos))
+
+    def descartar(self, sessao):
+        """
+        Descarta os arquivos da sessão (um rerun tira da tela os botões que os usavam).
+        """
+        with self._trava:
+            self._sessoes.pop(sessao, None)
+
+    def obter(self, sessao, formato):
+        with self._trava:
+            guardados = self._sessoes.get(sessao)
+        return guardados[2].get(formato) if guardados else None
+
+    def liberar_ociosos(self, ociosidade, limite, expiracao=3600):
+        """
+        Descarta os arquivos das sessões ociosas acima do limite e das expiradas. Retorna
+        (arquivos, bytes) liberados.
+        """
+        agora = self._agora()
+        with self._trava:
+            ociosas = [sessao for sessao, (instante, tamanho, _) in self._sessoes.items()
+                       if (agora - instante >= ociosidade and tamanho > limite) or agora - instante >= expiracao]
+            liberados = [self._sessoes.pop(sessao)[2] for sessao in ociosas]
+        return (sum(len(arquivos) for arquivos in liberados),
+                sum(len(dados) for arquivos in liberados for dados in arquivos.values()))
+
+    def __len__(self):
+        return len(self._sessoes)
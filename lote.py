@@ -0,0 +1,282 @@
+"""
+Cadastro em lote: gera as fichas de uma lista de clientes (CSV ou XLSX) sem passar pelo formulário.
+
+As colunas da planilha de entrada são os mesmos campos da ficha, identificados pela chave do
+formulário com ou sem o sufixo (ex.: "nome_input" ou "nome", "cliente_cep", "entrega_rua",
+"ref1_contato", "observacao", "doc_contrato_social"). O documento pode vir em "cpf"/"cnpj" ou em
+uma coluna "documento" junto com "tipo_doc" (CPF/CNPJ; se faltar, é deduzido pelo número de
+dígitos). As seções de entrega e referências são consideradas cadastradas quando algum dos seus
+campos vier preenchido.
+
+Cada linha passa pela mesma validação do botão "Gerar e Baixar Ficha em Excel" (campos
+obrigatórios e formato de CPF/CNPJ, CEP, telefones, UF e email). As linhas válidas
+viram uma planilha por cliente (--saida PASTA) ou uma aba por cliente em planilhas com até
+--abas-por-arquivo abas (--um-arquivo ARQUIVO.xlsx; as partes seguintes à primeira ganham o
+sufixo _002, _003...); as rejeitadas vão para um relatório CSV com os motivos.
+
+A entrada é lida em blocos e processada em paralelo por um pool de processos, com um número
+limitado de blocos em andamento. No modo --saida a memória não cresce com o tamanho do arquivo.
+No modo --um-arquivo o xlsxwriter mantém cada aba na memória (cerca de 13 KB) até fechar a
+planilha, então a memória cresce com o número de abas de uma parte, e não com a entrada toda:
+com as 500 abas padrão, uns 7 MB.
+
+Uso:
+    python lote.py clientes.csv --saida fichas/
+    python lote.py clientes.xlsx --um-arquivo fichas.xlsx --rejeitadas rejeitadas.csv
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ficha import (CAMPOS, CAMPOS_POR_CHAVE, SECOES_OPCIONAIS, adicionar_aba, campos_faltando, chave_documento,
+                   escrever_linha, exportar_ficha, formato_cabecalho, linhas_ficha, nome_arquivo)
+from validacao import erros_lote, normalizar_cnpj
+
+# --- Leitura da Entrada ---
+def _sem_sufixo(chave):
+    for sufixo in ("_input", "_area", "_radio"):
+        if chave.endswith(sufixo):
+            return chave[:-len(sufixo)]
+    return chave
+
+# Nome de coluna aceito (em minúsculas) -> chave do formulário
+COLUNAS = {}
+for _campo in CAMPOS:
+    COLUNAS[_campo.chave] = COLUNAS[_sem_sufixo(_campo.chave)] = _campo.chave
+COLUNAS.update({"tipo_documento": "tipo_doc_radio", "documento": "documento"})
+
+# Células numéricas do Excel perdem os zeros à esquerda: chave -> tamanhos possíveis do número
+DIGITOS = {"cpf_input": (11,), "cnpj_input": (14,), "cliente_cep_input": (8,), "entrega_cep_input": (8,),
+           "documento": (11, 14)}
+
+VERDADEIRO = {"sim", "s", "x", "1", "true", "verdadeiro"}
+
+def ler_linhas(caminho):
+    """
+    Gera (número da linha, dict coluna -> texto) sem carregar o arquivo inteiro na memória.
+    """
+    if caminho.lower().endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(caminho, read_only=True, data_only=True)
+        try:
+            linhas = workbook.active.iter_rows(values_only=True)
+            cabecalho = [str(c or "").strip() for c in next(linhas, ())]
+            chaves = [COLUNAS.get(coluna.lower()) for coluna in cabecalho]
+            for numero, valores in enumerate(linhas, start=2):
+                tipo = next((str(valor or "").strip().upper() for chave, valor in zip(chaves, valores)
+                             if chave == "tipo_doc_radio"), "")
+                yield numero, {coluna: _texto(valor, _digitos(chave, tipo))
+                               for coluna, chave, valor in zip(cabecalho, chaves, valores)}
+        finally:
+            workbook.close()
+    else:
+        with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+            amostra = arquivo.read(4096)
+            arquivo.seek(0)
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t") if amostra else csv.excel
+            for numero, registro in enumerate(csv.DictReader(arquivo, dialect=dialeto), start=2):
+                yield numero, registro
+
+def _digitos(chave, tipo):
+    if chave == "documento" and tipo in ("CPF", "CNPJ"):
+        return DIGITOS[chave_documento(tipo)]
+    return DIGITOS.get(chave, ())
+
+def _texto(valor, digitos=()):
+    if valor is None:
+        return ""
+    # Números inteiros lidos do Excel (CPF, CEP, telefone) não devem ganhar ".0"
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        # CPF, CNPJ e CEP guardados como número voltam com os zeros à esquerda (01310100)
+        texto = str(valor)
+        return texto.zfill(next((tamanho for tamanho in digitos if len(texto) <= tamanho), 0))
+    return str(valor)
+
+def estado_da_linha(registro):
+    """
+    Converte uma linha da planilha no mesmo formato do st.session_state usado pela ficha.
+    """
+    estado = {campo.chave: campo.padrao for campo in CAMPOS}
+    # Vazio até a linha informar o tipo; senão ele é deduzido do documento
+    estado["tipo_doc_radio"] = ""
+    documento = ""
+    for coluna, valor in registro.items():
+        chave = COLUNAS.get((coluna or "").strip().lower())
+        if chave is None:
+            continue
+        valor = (valor or "").strip()
+        if chave == "documento":
+            documento = valor
+        elif isinstance(CAMPOS_POR_CHAVE[chave].padrao, bool):
+            estado[chave] = valor.lower() in VERDADEIRO
+        else:
+            estado[chave] = valor
+
+    tipo = estado["tipo_doc_radio"].upper()
+    if tipo not in ("CPF", "CNPJ"):
+        # Sem tipo informado: CNPJ tem 14 posições (números ou letras), CPF tem 11
+        cnpj = normalizar_cnpj(documento or estado["cnpj_input"])
+        tipo = "CNPJ" if len(cnpj) == 14 or (estado["cnpj_input"] and not estado["cpf_input"]) else "CPF"
+    estado["tipo_doc_radio"] = tipo
+    if documento:
+        estado[chave_documento(tipo)] = documento
+
+    for secao, controle in SECOES_OPCIONAIS.items():
+        estado[controle] = any(estado[campo.chave] for campo in CAMPOS if campo.secao == secao)
+    return estado
+
+def motivos_rejeicao(estado):
+    """
+    Mesma validação do formulário: lista os campos obrigatórios que ficaram vazios.
+    """
+    return [f"Campo obrigatório vazio: {campo.rotulo}" for campo in campos_faltando(estado)]
+
+# --- Processamento (executado nos processos do pool) ---
+def processar_bloco(bloco, pasta_saida):
+    """
+    Valida um bloco de linhas. Com pasta_saida, grava uma planilha por cliente e não devolve as
+    linhas; sem ela, devolve as linhas das fichas para o processo principal montar as abas.
+    Retorna (fichas, rejeitadas).
+    """
+    fichas, rejeitadas = [], []
+    estados = [estado_da_linha(registro) for _, registro in bloco]
+    # Validação de formato vetorizada: cada campo é checado de uma vez para o bloco inteiro
+    erros = erros_lote(estados)
+    for (numero, _), estado, erros_linha in zip(bloco, estados, erros):
+        motivos = motivos_rejeicao(estado) + list(erros_linha.values())
+        if motivos:
+            documento = estado[chave_documento(estado["tipo_doc_radio"])]
+            rejeitadas.append((numero, estado["nome_input"], documento, "; ".join(motivos)))
+        elif pasta_saida:
+            nome = re.sub(r"[^\w.-]", "_", nome_arquivo(estado, "xlsx"))
+            with open(os.path.join(pasta_saida, f"{numero:07d}_{nome}"), "wb") as arquivo:
+                arquivo.write(exportar_ficha(estado)["xlsx"])
+            fichas.append((numero, None, None))
+        else:
+            fichas.append((numero, estado["nome_input"], list(linhas_ficha(estado))))
+    return fichas, rejeitadas
+
+def _blocos(linhas, tamanho):
+    bloco = []
+    for linha in linhas:
+        bloco.append(linha)
+        if len(bloco) == tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+def _nome_aba(numero, nome):
+    # O Excel limita o nome da aba a 31 caracteres e não aceita []:*?/\
+    return re.sub(r"[\[\]:*?/\\']", "_", f"{numero} {nome}")[:31].strip()
+
+def caminho_parte(caminho, parte):
+    """
+    Caminho da parte `parte` (a partir de 1) do modo --um-arquivo: a primeira usa o próprio
+    caminho e as demais ganham um sufixo (fichas.xlsx, fichas_002.xlsx, fichas_003.xlsx...).
+    """
+    if parte == 1:
+        return caminho
+    raiz, extensao = os.path.splitext(caminho)
+    return f"{raiz}_{parte:03d}{extensao}"
+
+# --- Execução ---
+def executar(entrada, pasta_saida=None, um_arquivo=None, caminho_rejeitadas="rejeitadas.csv",
+             processos=None, tamanho_bloco=500, abas_por_arquivo=500):
+    """
+    Processa a planilha de entrada e retorna (linhas lidas, fichas geradas, rejeitadas, segundos).
+    """
+    processos = processos or os.cpu_count() or 1
+    if pasta_saida:
+        os.makedirs(pasta_saida, exist_ok=True)
+
+    workbook = cabecalho = None
+    partes = abas = 0
+
+    def nova_parte():
+        nonlocal workbook, cabecalho, partes, abas
+        import xlsxwriter
+
+        if workbook is not None:
+            workbook.close()
+        partes += 1
+        abas = 0
+        workbook = xlsxwriter.Workbook(caminho_parte(um_arquivo, partes))
+        cabecalho = formato_cabecalho(workbook)
+
+    if um_arquivo:
+        nova_parte()
+
+    inicio = time.perf_counter()
+    lidas = geradas = rejeitadas = 0
+    with open(caminho_rejeitadas, "w", newline="", encoding="utf-8-sig") as arquivo_rejeitadas, \
+            ProcessPoolExecutor(max_workers=processos) as pool:
+        relatorio = csv.writer(arquivo_rejeitadas)
+        relatorio.writerow(("linha", "nome", "documento", "motivos"))
+
+        def coletar(futuro):
+            nonlocal geradas, rejeitadas, abas
+            fichas, rejeicoes = futuro.result()
+            relatorio.writerows(rejeicoes)
+            rejeitadas += len(rejeicoes)
+            geradas += len(fichas)
+            if workbook is not None:
+                for numero, nome, linhas in fichas:
+                    # Fechar a parte cheia libera da memória as abas que o xlsxwriter acumula
+                    if abas == abas_por_arquivo:
+                        nova_parte()
+                    worksheet = adicionar_aba(workbook, _nome_aba(numero, nome), cabecalho)
+                    for i, linha in enumerate(linhas, start=1):
+                        escrever_linha(worksheet, i, linha)
+                    abas += 1
+
+        # Limita os blocos em andamento para manter a memória constante
+        pendentes = []
+        for bloco in _blocos(ler_linhas(entrada), tamanho_bloco):
+            lidas += len(bloco)
+            pendentes.append(pool.submit(processar_bloco, bloco, pasta_saida))
+            if len(pendentes) >= 2 * processos:
+                # As abas precisam sair na ordem da entrada: espera sempre o bloco mais antigo
+                if workbook is not None:
+                    coletar(pendentes.pop(0))
+                else:
+                    prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in prontos:
+                        pendentes.remove(futuro)
+                        coletar(futuro)
+        for futuro in pendentes:
+            coletar(futuro)
+
+    if workbook is not None:
+        workbook.close()
+    return lidas, geradas, rejeitadas, time.perf_counter() - inicio
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("entrada", help="Planilha de clientes (.csv ou .xlsx).")
+    destino = parser.add_mutually_exclusive_group(required=True)
+    destino.add_argument("--saida", help="Pasta onde gravar uma planilha por cliente.")
+    destino.add_argument("--um-arquivo", help="Planilha com uma aba por cliente, dividida em partes.")
+    parser.add_argument("--abas-por-arquivo", type=int, default=500,
+                        help="Abas por planilha no modo --um-arquivo (a memória cresce com esse número).")
+    parser.add_argument("--rejeitadas", default="rejeitadas.csv", help="Relatório das linhas rejeitadas (CSV).")
+    parser.add_argument("--processos", type=int, default=None, help="Processos no pool (padrão: núcleos da máquina).")
+    parser.add_argument("--bloco", type=int, default=500, help="Linhas por bloco enviado a cada processo.")
+    args = parser.parse_args(argv)
+
+    lidas, geradas, rejeitadas, segundos = executar(
+        args.entrada, args.saida, args.um_arquivo, args.rejeitadas, args.processos, args.bloco, args.abas_por_arquivo
+    )
+    print(f"{lidas} linhas lidas: {geradas} fichas geradas, {rejeitadas} rejeitadas (ver {args.rejeitadas}).")
+    print(f"Tempo: {segundos:.1f} s ({lidas / segundos if segundos else 0:.0f} linhas/s).")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
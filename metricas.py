@@ -0,0 +1,263 @@
+import atexit
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- Instrumentação do Cadastro (opcional) ---
+# Tempos (rerun, validação, exportação), contadores (reruns, exportações, falhas de validação)
+# e o tamanho do estado de cada sessão, exportados no formato texto do Prometheus. Só fica
+# ativa se CADASTRO_METRICAS (arquivo .prom, regravado a cada CADASTRO_METRICAS_INTERVALO
+# segundos, para o textfile collector do node_exporter) ou CADASTRO_METRICAS_PORTA (endpoint
+# HTTP /metrics) estiverem definidas. Desativada, cada chamada custa uma comparação com None.
+
+CAMINHO_METRICAS = os.environ.get("CADASTRO_METRICAS", "")
+PORTA_METRICAS = int(os.environ.get("CADASTRO_METRICAS_PORTA") or 0)
+ENDERECO_METRICAS = os.environ.get("CADASTRO_METRICAS_ENDERECO", "127.0.0.1")
+INTERVALO_ESCRITA = float(os.environ.get("CADASTRO_METRICAS_INTERVALO", 15))
+# O tamanho do estado de uma sessão é medido no primeiro rerun e depois a cada N reruns
+AMOSTRAGEM_SESSAO = int(os.environ.get("CADASTRO_METRICAS_AMOSTRAGEM", 10))
+# Sessões sem rerun há mais que isso deixam de contar nas medidas de sessão
+EXPIRACAO_SESSAO = 30 * 60
+
+ATIVAS = bool(CAMINHO_METRICAS or PORTA_METRICAS)
+
+FAIXAS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAIXAS_BYTES = tuple(1024 * 4 ** i for i in range(9))  # 1 KiB a 64 MiB
+
+# nome -> (tipo, descrição, faixas do histograma)
+METRICAS = {
+    "cadastro_rerun_segundos": ("histogram", "Duração de cada execução do script (rerun).", FAIXAS_SEGUNDOS),
+    "cadastro_validacao_segundos": ("histogram", "Duração da validação de formato da ficha.", FAIXAS_SEGUNDOS),
+    "cadastro_exportacao_segundos": ("histogram", "Duração da geração dos arquivos da ficha.", FAIXAS_SEGUNDOS),
+    "cadastro_reruns_total": ("counter", "Execuções do script.", None),
+    "cadastro_exportacoes_total": ("counter", "Gerações de arquivos da ficha, por origem (rerun ou download).", None),
+    "cadastro_falhas_validacao_total": ("counter", "Fichas enviadas e recusadas, por motivo.", None),
+    "cadastro_arquivos_liberados_total": ("counter", "Arquivos de sessões ociosas descartados (refeitos se baixados depois).", None),
+    "cadastro_arquivos_liberados_bytes_total": ("counter", "Bytes dos arquivos de sessões ociosas descartados.", None),
+    "cadastro_sessao_bytes": ("histogram", "Tamanho estimado do estado das sessões, por amostra.", FAIXAS_BYTES),
+    "cadastro_sessoes": ("gauge", "Sessões com rerun nos últimos 30 minutos.", None),
+    "cadastro_sessoes_bytes": ("gauge", "Soma da última amostra de estado de cada sessão.", None),
+    "cadastro_sessoes_bytes_max": ("gauge", "Maior última amostra de estado entre as sessões.", None),
+}
+
+def tamanho_estado(estado):
+    """
+    Estimativa em bytes de um dict (ou st.session_state): chaves e valores, descendo em
+    listas, tuplas, conjuntos e dicts. Objetos compartilhados são contados uma vez.
+    """
+    vistos = set()
+
+    def tamanho(valor):
+        if id(valor) in vistos:
+            return 0
+        vistos.add(id(valor))
+        total = sys.getsizeof(valor)
+        if isinstance(valor, dict):
+            total += sum(tamanho(chave) + tamanho(item) for chave, item in valor.items())
+        elif isinstance(valor, (list, tuple, set, frozenset)):
+            total += sum(tamanho(item) for item in valor)
+        return total
+
+    return sum(tamanho(chave) + tamanho(estado[chave]) for chave in list(estado))
+
+def _rotulos(rotulos):
+    return tuple(sorted(rotulos.items()))
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _formatar_rotulos(rotulos, extra=()):
+    pares = [*rotulos, *extra]
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in pares) + "}"
+
+def _formatar_numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) and not valor.is_integer() else str(int(valor))
+
+class _Cronometro:
+    __slots__ = ("_metricas", "_nome", "_rotulos", "_inicio")
+
+    def __init__(self, metricas, nome, rotulos):
+        self._metricas, self._nome, self._rotulos = metricas, nome, rotulos
+
+    def __enter__(self):
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *erro):
+        self._metricas.observar(self._nome, time.perf_counter() - self._inicio, **self._rotulos)
+        return False
+
+class Metricas:
+    """
+    Registro das medidas de um processo, seguro entre as threads das sessões. texto() devolve
+    o formato de exposição do Prometheus.
+    """
+
+    def __init__(self, agora=time.monotonic):
+        self._agora = agora
+        self._trava = threading.Lock()
+        self._contadores = defaultdict(float)  # (nome, rótulos) -> valor
+        self._histogramas = {}  # (nome, rótulos) -> [contagem por faixa..., +Inf, soma]
+        self._sessoes = {}  # id da sessão -> [reruns, bytes da última amostra, instante do último rerun]
+
+    def contar(self, nome, quantidade=1, **rotulos):
+        with self._trava:
+            self._contadores[nome, _rotulos(rotulos)] += quantidade
+
+    def observar(self, nome, valor, **rotulos):
+        faixas = METRICAS[nome][2]
+        with self._trava:
+            contagens = self._histogramas.get((nome, _rotulos(rotulos)))
+            if contagens is None:
+                contagens = self._histogramas[nome, _rotulos(rotulos)] = [0] * (len(faixas) + 1) + [0.0]
+            contagens[bisect_left(faixas, valor)] += 1
+            contagens[-1] += valor
+
+    def cronometro(self, nome, **rotulos):
+        """
+        Contexto que observa no histograma `nome` o tempo gasto dentro dele.
+        """
+        return _Cronometro(self, nome, rotulos)
+
+    def amostrar_sessao(self, sessao, medir):
+        """
+        Conta um rerun da sessão e, no primeiro e a cada AMOSTRAGEM_SESSAO reruns, chama
+        medir() para registrar o tamanho do estado dela.
+        """
+        with self._trava:
+            dados = self._sessoes.setdefault(sessao, [0, 0, 0.0])
+            dados[0] += 1
+            dados[2] = self._agora()
+            amostrar = AMOSTRAGEM_SESSAO <= 1 or dados[0] % AMOSTRAGEM_SESSAO == 1
+        if amostrar:
+            self.registrar_sessao(sessao, medir())
+
+    def registrar_sessao(self, sessao, tamanho):
+        """
+        Registra uma amostra do tamanho (em bytes) do estado da sessão.
+        """
+        self.observar("cadastro_sessao_bytes", tamanho)
+        with self._trava:
+            dados = self._sessoes.setdefault(sessao, [0, 0, self._agora()])
+            dados[1] = tamanho
+
+    def texto(self):
+        """
+        Todas as medidas no formato texto do Prometheus (versão 0.0.4).
+        """
+        with self._trava:
+            limite = self._agora() - EXPIRACAO_SESSAO
+            for sessao in [sessao for sessao, dados in self._sessoes.items() if dados[2] < limite]:
+                del self._sessoes[sessao]
+            tamanhos = [dados[1] for dados in self._sessoes.values()]
+            contadores = dict(self._contadores)
+            histogramas = {chave: list(contagens) for chave, contagens in self._histogramas.items()}
+        medidores = {
+            ("cadastro_sessoes", ()): len(tamanhos),
+            ("cadastro_sessoes_bytes", ()): sum(tamanhos),
+            ("cadastro_sessoes_bytes_max", ()): max(tamanhos, default=0),
+        }
+
+        linhas = []
+        for nome, (tipo, descricao, faixas) in METRICAS.items():
+            linhas.append(f"# HELP {nome} {descricao}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+            if tipo == "histogram":
+                for (chave, rotulos), contagens in sorted(histogramas.items()):
+                    if chave != nome:
+                        continue
+                    acumulado = 0
+                    for faixa, contagem in zip((*faixas, "+Inf"), contagens):
+                        acumulado += contagem
+                        le = faixa if faixa == "+Inf" else _formatar_numero(faixa)
+                        linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos, [('le', le)])} {acumulado}")
+                    linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {_formatar_numero(contagens[-1])}")
+                    linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {acumulado}")
+            else:
+                valores = contadores if tipo == "counter" else medidores
+                for (chave, rotulos), valor in sorted(valores.items()):
+                    if chave == nome:
+                        linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {_formatar_numero(valor)}")
+        return "\n".join(linhas) + "\n"
+
+    def gravar(self, caminho):
+        """
+        Grava texto() em `caminho` de forma atômica (arquivo temporário + os.replace), para que
+        o coletor nunca leia um arquivo pela metade.
+        """
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.texto())
+        os.replace(temporario, caminho)
+
+# --- Registro do Processo ---
+_SEM_MEDICAO = nullcontext()
+_registro = Metricas() if ATIVAS else None
+
+def cronometro(nome, **rotulos):
+    if _registro is None:
+        return _SEM_MEDICAO
+    return _registro.cronometro(nome, **rotulos)
+
+def contar(nome, quantidade=1, **rotulos):
+    if _registro is not None:
+        _registro.contar(nome, quantidade, **rotulos)
+
+def amostrar_sessao(sessao, medir):
+    if _registro is not None:
+        _registro.amostrar_sessao(sessao, medir)
+
+def registrar_sessao(sessao, tamanho):
+    if _registro is not None:
+        _registro.registrar_sessao(sessao, tamanho)
+
+def iniciar(caminho=CAMINHO_METRICAS, porta=PORTA_METRICAS, endereco=ENDERECO_METRICAS):
+    """
+    Inicia a exportação das métricas em threads de fundo: a regravação periódica do arquivo
+    e/ou o servidor HTTP em http://endereco:porta/metrics. Deve ser chamada uma vez por
+    processo; retorna o servidor HTTP (ou None).
+    """
+    if _registro is None:
+        return None
+
+    if caminho:
+        def gravar_periodicamente():
+            while True:
+                try:
+                    _registro.gravar(caminho)
+                except OSError as erro:
+                    print(f"Não foi possível gravar as métricas em {caminho}: {erro}", file=sys.stderr)
+                time.sleep(INTERVALO_ESCRITA)
+
+        threading.Thread(target=gravar_periodicamente, name="gravar_metricas", daemon=True).start()
+        atexit.register(_registro.gravar, caminho)
+
+    if not porta:
+        return None
+
+    class Endpoint(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            corpo = _registro.texto().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((endereco, porta), Endpoint)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name="endpoint_metricas", daemon=True).start()
+    return servidor
@@ -0,0 +1,286 @@
+import os
+import queue
+import sqlite3
+import threading
+import unicodedata
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+
+from ficha import CAMPOS, chave_documento
+from validacao import normalizar_cnpj
+
+# --- Registro Local de Clientes (SQLite) ---
+# Cada ficha validada é gravada em um banco SQLite em modo WAL, que permite leituras simultâneas
+# à escrita. As tabelas são derivadas do esquema da ficha (ficha.CAMPOS):
+#
+#   clientes    -> dados pessoais/empresariais, documento e observações (1 linha por cliente)
+#   enderecos   -> endereço principal e de entrega, achatados (1 linha por cliente e tipo)
+#   referencias -> até 3 referências por cliente, na ordem da ficha
+#
+# Todas as escritas do processo passam por uma única thread gravadora, que junta em uma mesma
+# transação as fichas que chegarem enquanto a anterior é gravada. Entre processos, a
+# concorrência fica a cargo do BEGIN IMMEDIATE + busy timeout do SQLite.
+
+CAMINHO_BANCO = os.environ.get("CADASTRO_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "clientes.db"))
+
+def _coluna(chave, prefixo=""):
+    """
+    Nome da coluna no banco para uma chave do st.session_state (ex.: "cliente_cep_input" -> "cep").
+    """
+    nome = chave[len(prefixo):]
+    for sufixo in ("_input", "_area", "_radio"):
+        if nome.endswith(sufixo):
+            nome = nome[:-len(sufixo)]
+    return {"rua": "logradouro"}.get(nome, nome)
+
+# Chave do st.session_state -> coluna, por tabela
+COLUNAS_CLIENTE = {
+    campo.chave: _coluna(campo.chave) for campo in CAMPOS
+    if campo.secao is None and not campo.chave.startswith("cliente_")
+}
+COLUNAS_ENDERECO = {
+    "principal": {campo.chave: _coluna(campo.chave, "cliente_") for campo in CAMPOS if campo.chave.startswith("cliente_")},
+    "entrega": {campo.chave: _coluna(campo.chave, "entrega_") for campo in CAMPOS if campo.secao == "entrega"},
+}
+CHAVES_REFERENCIAS = [campo.chave for campo in CAMPOS if campo.secao == "referencias"]
+PARES_REFERENCIAS = list(zip(CHAVES_REFERENCIAS[0::2], CHAVES_REFERENCIAS[1::2]))
+CAMPOS_SIM_NAO = {campo.chave for campo in CAMPOS if isinstance(campo.padrao, bool)}
+
+def _ddl():
+    colunas_cliente = ",\n    ".join(
+        f"{coluna} {'INTEGER' if chave in CAMPOS_SIM_NAO else 'TEXT'} NOT NULL"
+        for chave, coluna in COLUNAS_CLIENTE.items()
+    )
+    colunas_endereco = ",\n    ".join(f"{coluna} TEXT NOT NULL" for coluna in COLUNAS_ENDERECO["principal"].values())
+    return f"""
+CREATE TABLE IF NOT EXISTS clientes (
+    id INTEGER PRIMARY KEY,
+    documento TEXT NOT NULL,
+    documento_normalizado TEXT NOT NULL,
+    nome_normalizado TEXT NOT NULL,
+    {colunas_cliente},
+    criado_em TEXT NOT NULL,
+    atualizado_em TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_clientes_documento ON clientes (documento_normalizado);
+CREATE INDEX IF NOT EXISTS idx_clientes_nome ON clientes (nome_normalizado);
+
+CREATE TABLE IF NOT EXISTS enderecos (
+    cliente_id INTEGER NOT NULL REFERENCES clientes (id) ON DELETE CASCADE,
+    tipo TEXT NOT NULL CHECK (tipo IN ('principal', 'entrega')),
+    {colunas_endereco},
+    PRIMARY KEY (cliente_id, tipo)
+);
+CREATE INDEX IF NOT EXISTS idx_enderecos_estado_cidade ON enderecos (estado, cidade);
+
+CREATE TABLE IF NOT EXISTS referencias (
+    cliente_id INTEGER NOT NULL REFERENCES clientes (id) ON DELETE CASCADE,
+    ordem INTEGER NOT NULL,
+    nome TEXT NOT NULL,
+    contato TEXT NOT NULL,
+    PRIMARY KEY (cliente_id, ordem)
+);
+"""
+
+# --- Normalização ---
+def normalizar_documento(documento):
+    """
+    Remove a pontuação do CPF/CNPJ, para que "123.456.789-09" e "12345678909" coincidam
+    (as letras do CNPJ alfanumérico são mantidas, em maiúsculas).
+    """
+    return normalizar_cnpj(documento)
+
+def normalizar_texto(texto):
+    """
+    Remove acentos e diferenças de maiúsculas/minúsculas e espaços repetidos.
+    """
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+# --- Registro ---
+class RegistroClientes:
+    """
+    Acesso ao banco de clientes. Uma instância por processo, compartilhada entre as sessões:
+    as leituras usam um pequeno pool de conexões e as escritas passam pela thread gravadora.
+
+    O Streamlit executa cada rerun numa thread nova, então uma conexão por thread seria aberta
+    (com seus PRAGMAs) a cada rerun. As conexões do pool aceitam qualquer thread e cada uma é
+    usada por uma consulta de cada vez.
+    """
+
+    def __init__(self, caminho=CAMINHO_BANCO, tamanho_lote=100, conexoes_leitura=4):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self._livres = queue.LifoQueue(maxsize=conexoes_leitura)
+        self._fila = queue.Queue()
+
+        conexao = self._conectar()
+        try:
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.executescript(_ddl())
+        finally:
+            conexao.close()
+
+        self._gravadora = threading.Thread(target=self._gravar_lotes, name="registro_clientes", daemon=True)
+        self._gravadora.start()
+
+    def _conectar(self, check_same_thread=True):
+        # isolation_level=None: as transações são abertas explicitamente (BEGIN IMMEDIATE)
+        conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None, check_same_thread=check_same_thread)
+        conexao.row_factory = sqlite3.Row
+        conexao.execute("PRAGMA foreign_keys=ON")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        return conexao
+
+    @contextmanager
+    def _leitura(self):
+        """
+        Empresta uma conexão de leitura do pool (ou abre uma, se todas estiverem em uso) e a
+        devolve no fim; as que não cabem mais no pool são fechadas.
+        """
+        try:
+            conexao = self._livres.get_nowait()
+        except queue.Empty:
+            conexao = self._conectar(check_same_thread=False)
+        try:
+            yield conexao
+        finally:
+            try:
+                self._livres.put_nowait(conexao)
+            except queue.Full:
+                conexao.close()
+
+    # --- Consultas ---
+    def buscar_resumo(self, documento):
+        """
+        Retorna (id, nome) do cliente com este CPF/CNPJ, ou None. Usa o índice do documento.
+        """
+        documento_normalizado = normalizar_documento(documento)
+        if not documento_normalizado:
+            return None
+        with self._leitura() as conexao:
+            linha = conexao.execute(
+                "SELECT id, nome FROM clientes WHERE documento_normalizado = ?", (documento_normalizado,)
+            ).fetchone()
+        return (linha["id"], linha["nome"]) if linha else None
+
+    def carregar(self, documento):
+        """
+        Retorna os valores do cliente por chave do st.session_state (para preencher a ficha), ou None.
+        """
+        with self._leitura() as conexao:
+            cliente = conexao.execute(
+                "SELECT * FROM clientes WHERE documento_normalizado = ?", (normalizar_documento(documento),)
+            ).fetchone()
+            if cliente is None:
+                return None
+            enderecos = conexao.execute("SELECT * FROM enderecos WHERE cliente_id = ?", (cliente["id"],)).fetchall()
+            referencias = conexao.execute(
+                "SELECT nome, contato FROM referencias WHERE cliente_id = ? ORDER BY ordem", (cliente["id"],)
+            ).fetchall()
+
+        valores = {chave: cliente[coluna] for chave, coluna in COLUNAS_CLIENTE.items()}
+        valores[chave_documento(cliente["tipo_doc"])] = cliente["documento"]
+        for chave in CAMPOS_SIM_NAO:
+            valores[chave] = bool(valores[chave])
+
+        for endereco in enderecos:
+            for chave, coluna in COLUNAS_ENDERECO[endereco["tipo"]].items():
+                valores[chave] = endereco[coluna]
+
+        for (chave_nome, chave_contato), referencia in zip(PARES_REFERENCIAS, referencias):
+            valores[chave_nome] = referencia["nome"]
+            valores[chave_contato] = referencia["contato"]
+        return valores
+
+    # --- Gravação ---
+    def salvar(self, valores, timeout=30):
+        """
+        Grava (ou atualiza) a ficha validada, com os valores de ficha.valores_ficha().
+        Bloqueia até a gravação e retorna True se o cliente é novo, False se foi atualizado.
+        """
+        resultado = Future()
+        self._fila.put((valores, resultado))
+        return resultado.result(timeout)
+
+    def _gravar_lotes(self):
+        conexao = self._conectar()
+        while True:
+            lote = [self._fila.get()]
+            # Junta no mesmo commit as fichas que chegaram enquanto a anterior era gravada
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                novos = self._transacao(conexao, [valores for valores, _ in lote])
+            except Exception:
+                # Um registro com problema não deve derrubar o lote inteiro: regrava um a um
+                for valores, resultado in lote:
+                    try:
+                        resultado.set_result(self._transacao(conexao, [valores])[0])
+                    except Exception as erro:
+                        resultado.set_exception(erro)
+            else:
+                for (_, resultado), novo in zip(lote, novos):
+                    resultado.set_result(novo)
+
+    def _transacao(self, conexao, lote):
+        conexao.execute("BEGIN IMMEDIATE")
+        try:
+            novos = [self._gravar(conexao, valores) for valores in lote]
+        except BaseException:
+            conexao.execute("ROLLBACK")
+            raise
+        conexao.execute("COMMIT")
+        return novos
+
+    def _gravar(self, conexao, valores):
+        tipo_documento = valores["tipo_doc_radio"]
+        documento = valores[chave_documento(tipo_documento)]
+        documento_normalizado = normalizar_documento(documento)
+        if not documento_normalizado:
+            raise ValueError("A ficha não tem CPF/CNPJ para identificar o cliente.")
+        agora = datetime.now().isoformat(timespec="seconds")
+
+        dados = {coluna: valores.get(chave, "") for chave, coluna in COLUNAS_CLIENTE.items()}
+        dados.update(documento=documento, documento_normalizado=documento_normalizado,
+                     nome_normalizado=normalizar_texto(valores.get("nome_input")), atualizado_em=agora)
+
+        existente = conexao.execute(
+            "SELECT id FROM clientes WHERE documento_normalizado = ?", (documento_normalizado,)
+        ).fetchone()
+        if existente:
+            cliente_id = existente["id"]
+            atribuicoes = ", ".join(f"{coluna} = :{coluna}" for coluna in dados)
+            conexao.execute(f"UPDATE clientes SET {atribuicoes} WHERE id = :id", {**dados, "id": cliente_id})
+            conexao.execute("DELETE FROM enderecos WHERE cliente_id = ?", (cliente_id,))
+            conexao.execute("DELETE FROM referencias WHERE cliente_id = ?", (cliente_id,))
+        else:
+            dados["criado_em"] = agora
+            colunas = ", ".join(dados)
+            marcadores = ", ".join(f":{coluna}" for coluna in dados)
+            cliente_id = conexao.execute(f"INSERT INTO clientes ({colunas}) VALUES ({marcadores})", dados).lastrowid
+
+        for tipo, colunas_endereco in COLUNAS_ENDERECO.items():
+            # O endereço de entrega só existe se a seção foi cadastrada na ficha
+            if not any(chave in valores for chave in colunas_endereco):
+                continue
+            endereco = {coluna: valores.get(chave, "") for chave, coluna in colunas_endereco.items()}
+            colunas = ", ".join(endereco)
+            marcadores = ", ".join(f":{coluna}" for coluna in endereco)
+            conexao.execute(
+                f"INSERT INTO enderecos (cliente_id, tipo, {colunas}) VALUES (:cliente_id, :tipo, {marcadores})",
+                {**endereco, "cliente_id": cliente_id, "tipo": tipo},
+            )
+
+        referencias = [(valores.get(nome, ""), valores.get(contato, "")) for nome, contato in PARES_REFERENCIAS]
+        conexao.executemany(
+            "INSERT INTO referencias (cliente_id, ordem, nome, contato) VALUES (?, ?, ?, ?)",
+            [(cliente_id, ordem, nome, contato)
+             for ordem, (nome, contato) in enumerate((r for r in referencias if r[0] or r[1]), start=1)],
+        )
+        return existente is None
@@ -0,0 +1,205 @@
+import re
+
+from ficha import CAMPOS_POR_CHAVE, valor_campo
+
+# --- Validação e Normalização dos Campos da Ficha ---
+# Cada regra tem duas versões com o mesmo resultado:
+#   - escalar (cpf_valido, cep_valido, ...): Python puro, para um valor do formulário;
+#   - vetorial (validar_cpfs, validar_ceps, ...): NumPy/pandas sobre uma coluna inteira, para lotes.
+# O NumPy/pandas só é importado quando uma função vetorial é usada, para não pesar na abertura do app.
+
+UFS = frozenset((
+    "AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO", "MA", "MT", "MS", "MG", "PA",
+    "PB", "PR", "PE", "PI", "RJ", "RN", "RS", "RO", "RR", "SC", "SP", "SE", "TO",
+))
+
+PESOS_CPF_1 = tuple(range(10, 1, -1))
+PESOS_CPF_2 = tuple(range(11, 1, -1))
+PESOS_CNPJ_1 = (5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+PESOS_CNPJ_2 = (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)
+
+RE_NAO_DIGITO = re.compile(r"[^0-9]")
+RE_NAO_ALFANUMERICO = re.compile(r"[^0-9A-Z]")
+RE_CEP = re.compile(r"^[0-9]{5}-?[0-9]{3}$")
+RE_EMAIL = re.compile(
+    r"^[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+@"
+    r"[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?)+$"
+)
+
+# --- Normalização ---
+def somente_digitos(texto):
+    return RE_NAO_DIGITO.sub("", texto or "")
+
+def normalizar_cnpj(cnpj):
+    """
+    CNPJ sem pontuação, em maiúsculas. Desde 2026 o CNPJ pode ter letras nas 12 primeiras posições.
+    """
+    return RE_NAO_ALFANUMERICO.sub("", (cnpj or "").upper())
+
+def normalizar_telefone(telefone):
+    """
+    Apenas os dígitos de DDD + número, sem o código do país (+55).
+    """
+    digitos = somente_digitos(telefone)
+    if len(digitos) in (12, 13) and digitos.startswith("55"):
+        digitos = digitos[2:]
+    return digitos
+
+def normalizar_uf(uf):
+    return (uf or "").strip().upper()
+
+def normalizar_email(email):
+    return (email or "").strip().lower()
+
+# --- Regras Escalares ---
+def _digito_verificador(valores, pesos):
+    resto = sum(v * p for v, p in zip(valores, pesos)) % 11
+    return 0 if resto < 2 else 11 - resto
+
+def cpf_valido(cpf):
+    digitos = somente_digitos(cpf)
+    if len(digitos) != 11 or digitos == digitos[0] * 11:
+        return False
+    numeros = [int(d) for d in digitos]
+    return (numeros[9] == _digito_verificador(numeros[:9], PESOS_CPF_1)
+            and numeros[10] == _digito_verificador(numeros[:10], PESOS_CPF_2))
+
+def cnpj_valido(cnpj):
+    texto = normalizar_cnpj(cnpj)
+    if len(texto) != 14 or not texto[12:].isdigit() or texto == texto[0] * 14:
+        return False
+    # Cada caractere vale seu código ASCII - 48 (dígitos 0-9, letras A=17 ... Z=42)
+    valores = [ord(c) - 48 for c in texto]
+    return (valores[12] == _digito_verificador(valores[:12], PESOS_CNPJ_1)
+            and valores[13] == _digito_verificador(valores[:13], PESOS_CNPJ_2))
+
+def cep_valido(cep):
+    texto = (cep or "").strip()
+    return bool(RE_CEP.match(texto)) and somente_digitos(texto) != "00000000"
+
+def telefone_valido(telefone):
+    """
+    DDD (dois dígitos, sem zero) + número: 8 dígitos para fixo ou 9 começando com 9 para celular.
+    """
+    digitos = normalizar_telefone(telefone)
+    if len(digitos) not in (10, 11) or "0" in digitos[:2]:
+        return False
+    return len(digitos) == 10 or digitos[2] == "9"
+
+def uf_valida(uf):
+    return normalizar_uf(uf) in UFS
+
+def email_valido(email):
+    return bool(RE_EMAIL.match((email or "").strip()))
+
+# --- Regras Vetoriais ---
+def _serie(valores):
+    import pandas as pd
+
+    return pd.Series(valores, dtype=object).fillna("").astype(str)
+
+def _matriz(textos, tamanho):
+    """
+    Converte textos já normalizados em uma matriz (n, tamanho) de valores ASCII - 48.
+    Textos de outro tamanho viram zeros e são marcados como inválidos na máscara devolvida.
+    """
+    import numpy as np
+
+    ok = (textos.str.len() == tamanho).to_numpy()
+    preenchidos = textos.where(ok, "0" * tamanho)
+    buffer = "".join(preenchidos).encode("ascii")
+    matriz = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, tamanho).astype(np.int16) - 48
+    return matriz, ok
+
+def _digitos_verificadores(matriz, pesos):
+    import numpy as np
+
+    resto = (matriz @ np.array(pesos, dtype=np.int16)) % 11
+    return np.where(resto < 2, 0, 11 - resto)
+
+def validar_cpfs(valores):
+    """
+    Versão vetorial de cpf_valido: recebe uma sequência/coluna e devolve um array de bool.
+    """
+    textos = _serie(valores).str.replace(r"[^0-9]", "", regex=True)
+    matriz, ok = _matriz(textos, 11)
+    repetidos = (matriz == matriz[:, :1]).all(axis=1)
+    return (ok & ~repetidos
+            & (matriz[:, 9] == _digitos_verificadores(matriz[:, :9], PESOS_CPF_1))
+            & (matriz[:, 10] == _digitos_verificadores(matriz[:, :10], PESOS_CPF_2)))
+
+def validar_cnpjs(valores):
+    """
+    Versão vetorial de cnpj_valido (aceita o CNPJ alfanumérico).
+    """
+    textos = _serie(valores).str.upper().str.replace(r"[^0-9A-Z]", "", regex=True)
+    matriz, ok = _matriz(textos, 14)
+    repetidos = (matriz == matriz[:, :1]).all(axis=1)
+    dv_numericos = (matriz[:, 12:] <= 9).all(axis=1)
+    return (ok & dv_numericos & ~repetidos
+            & (matriz[:, 12] == _digitos_verificadores(matriz[:, :12], PESOS_CNPJ_1))
+            & (matriz[:, 13] == _digitos_verificadores(matriz[:, :13], PESOS_CNPJ_2)))
+
+def validar_ceps(valores):
+    textos = _serie(valores).str.strip()
+    formato = textos.str.match(RE_CEP.pattern).to_numpy(dtype=bool)
+    zerado = (textos.str.replace("-", "", regex=False) == "00000000").to_numpy()
+    return formato & ~zerado
+
+def validar_telefones(valores):
+    import numpy as np
+
+    digitos = _serie(valores).str.replace(r"[^0-9]", "", regex=True)
+    tamanho = digitos.str.len()
+    com_pais = tamanho.isin((12, 13)) & digitos.str.startswith("55")
+    digitos = digitos.where(~com_pais, digitos.str[2:])
+    tamanho = digitos.str.len().to_numpy()
+    ddd_ok = ~digitos.str[:2].str.contains("0", regex=False).to_numpy(dtype=bool)
+    celular_ok = (digitos.str[2] == "9").to_numpy(dtype=bool)
+    return np.isin(tamanho, (10, 11)) & ddd_ok & ((tamanho == 10) | celular_ok)
+
+def validar_ufs(valores):
+    return _serie(valores).str.strip().str.upper().isin(UFS).to_numpy()
+
+def validar_emails(valores):
+    return _serie(valores).str.strip().str.match(RE_EMAIL.pattern).to_numpy(dtype=bool)
+
+# --- Validação da Ficha ---
+# (chave do campo, regra escalar, regra vetorial, mensagem). Campos vazios não são checados aqui:
+# a obrigatoriedade fica com ficha.campos_faltando.
+VALIDACOES = (
+    ("cpf_input", cpf_valido, validar_cpfs, "CPF inválido: os dígitos verificadores não conferem."),
+    ("cnpj_input", cnpj_valido, validar_cnpjs, "CNPJ inválido: os dígitos verificadores não conferem."),
+    ("email_input", email_valido, validar_emails, "Email inválido."),
+    ("telefone_input", telefone_valido, validar_telefones, "Telefone inválido: informe DDD + número (10 ou 11 dígitos)."),
+    ("celular_input", telefone_valido, validar_telefones, "Celular inválido: informe DDD + número (10 ou 11 dígitos)."),
+    ("cliente_cep_input", cep_valido, validar_ceps, "CEP inválido: informe 8 dígitos."),
+    ("cliente_estado_input", uf_valida, validar_ufs, "Estado inválido: informe a sigla da UF (ex: CE)."),
+    ("entrega_cep_input", cep_valido, validar_ceps, "CEP de entrega inválido: informe 8 dígitos."),
+    ("entrega_estado_input", uf_valida, validar_ufs, "Estado de entrega inválido: informe a sigla da UF (ex: CE)."),
+)
+
+def erros_ficha(estado):
+    """
+    Erros de formato dos campos preenchidos de uma ficha: {chave do campo: mensagem}.
+    """
+    erros = {}
+    for chave, regra, _, mensagem in VALIDACOES:
+        valor = valor_campo(CAMPOS_POR_CHAVE[chave], estado)
+        if valor and not regra(valor):
+            erros[chave] = mensagem
+    return erros
+
+def erros_lote(estados):
+    """
+    Mesmo resultado de erros_ficha para uma lista de fichas, validando cada campo de uma vez
+    para todas as linhas. Retorna uma lista de dicts, na ordem das fichas.
+    """
+    erros = [{} for _ in estados]
+    for chave, _, regra, mensagem in VALIDACOES:
+        campo = CAMPOS_POR_CHAVE[chave]
+        valores = [valor_campo(campo, estado) for estado in estados]
+        preenchidos = _serie(valores).to_numpy() != ""
+        for i in (preenchidos & ~regra(valores)).nonzero()[0]:
+            erros[i][chave] = mensagem
+    return erros
@@ -0,0 +1,428 @@
+import csv
+import hashlib
+import os
+import tempfile
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict, namedtuple
+from heapq import nlargest
+from io import BytesIO
+
+from registro import normalizar_texto
+
+# --- Histórico de Vendas (df_vendas.csv) ---
+# Cada linha do arquivo é um item de nota fiscal, com Empresa, Cliente, Vendedor, valores etc.
+# O cadastro usa o histórico para sugerir nomes de clientes já atendidos e para mostrar o
+# resumo das vendas de cada cliente.
+
+CAMINHO_VENDAS = os.environ.get("CADASTRO_VENDAS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "df_vendas.csv"))
+
+# --- Cache Colunar do Histórico (Parquet) ---
+# O CSV é convertido uma vez para Parquet, com tipos de verdade: datas como date32, textos
+# repetidos como dicionário (chegam ao pandas como Categorical) e inteiros no menor tipo que
+# comporta os valores. As leituras seguintes mapeiam o arquivo em memória e decodificam só as
+# colunas e os grupos de linhas pedidos. O tamanho e o mtime do CSV ficam nos metadados do
+# Parquet: se o CSV mudar, o cache é refeito na próxima leitura.
+#
+# O cache fica em CADASTRO_CACHE_VENDAS (pasta) ou ao lado do CSV; se a pasta não aceitar
+# escrita, vai para a pasta temporária do sistema. Se uma coluna inteira trouxer um valor
+# que não é inteiro, a conversão é refeita com ela em float64; se nem assim der certo, a
+# falha é lembrada para aquela versão do CSV e as leituras vão direto ao CSV (mais lentas).
+
+PASTA_CACHE_VENDAS = os.environ.get("CADASTRO_CACHE_VENDAS", "")
+
+COLUNAS_DATA = ("Data_Emissao", "Data_Cancelamento", "Data_expedicao", "Data_Saida")
+COLUNAS_INTEIRAS = {
+    "NF": "int32", "Qtd_Parcela": "int16", "Qtd_Prazo_Medio": "int16", "Qtd_Itens": "int32",
+    "Qtd_Volumes": "int32", "Qtd_Produto": "int32", "Mes": "int8", "Ano": "int16", "Dia": "int8",
+}
+COLUNAS_DECIMAIS = (
+    "Valor_Total_Nota", "Preco_Unitario", "Valor_Total_Item", "Custo_Item", "Preco_Un_Pdv",
+    "Valor_Custo_Compra", "Preco_Tabela", "Total_Custo_Compra", "Total_Lucro_Venda_Item",
+)
+
+_trava_cache = threading.Lock()
+_falhas_cache = {}  # caminho do CSV -> metadados de origem da versão que não pôde ser convertida
+
+def caminho_cache_vendas(caminho=CAMINHO_VENDAS):
+    nome = os.path.splitext(os.path.basename(caminho))[0] + ".parquet"
+    return os.path.join(PASTA_CACHE_VENDAS or os.path.dirname(os.path.abspath(caminho)), nome)
+
+def _caminho_cache_temporario(caminho):
+    # O hash do caminho separa os caches de CSVs com o mesmo nome em pastas diferentes
+    chave = hashlib.sha1(os.path.abspath(caminho).encode()).hexdigest()[:12]
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    return os.path.join(tempfile.gettempdir(), f"{nome}-{chave}.parquet")
+
+def _origem(caminho):
+    info = os.stat(caminho)
+    return {b"origem_tamanho": str(info.st_size).encode(), b"origem_mtime_ns": str(info.st_mtime_ns).encode()}
+
+def converter_vendas(caminho=CAMINHO_VENDAS, destino=None, linhas_por_grupo=128 * 1024, inteiros=True):
+    """
+    Converte o CSV do histórico para o cache Parquet, em blocos (a memória não cresce com o
+    tamanho do arquivo). Cada bloco vira um ou mais grupos de linhas, com estatísticas de
+    mínimo/máximo que permitem pular grupos inteiros ao filtrar. Com inteiros=False, as
+    colunas de COLUNAS_INTEIRAS são lidas como float64 (aceitam "1.5" e células vazias).
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    destino = destino or caminho_cache_vendas(caminho)
+    origem = _origem(caminho)
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        colunas = next(csv.reader(arquivo))
+
+    def tipo(coluna):
+        if coluna in COLUNAS_DATA:
+            return pa.timestamp("s")  # o leitor só aceita formato próprio (dd/mm/aaaa) em timestamps
+        if coluna in COLUNAS_INTEIRAS and inteiros:
+            return pa.type_for_alias(COLUNAS_INTEIRAS[coluna])
+        if coluna in COLUNAS_INTEIRAS or coluna in COLUNAS_DECIMAIS:
+            return pa.float64()
+        return pa.dictionary(pa.int32(), pa.string())
+
+    leitor = pa_csv.open_csv(
+        caminho,
+        read_options=pa_csv.ReadOptions(block_size=16 * 1024 * 1024),
+        convert_options=pa_csv.ConvertOptions(column_types={coluna: tipo(coluna) for coluna in colunas},
+                                              timestamp_parsers=["%d/%m/%Y"]),
+    )
+    esquema = pa.schema(
+        [pa.field(campo.name, pa.date32()) if campo.name in COLUNAS_DATA else campo for campo in leitor.schema],
+        metadata=origem,
+    )
+    # Grava em um arquivo temporário e troca de uma vez, para que nenhum leitor veja um cache pela metade
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    try:
+        with pq.ParquetWriter(temporario, esquema, compression="zstd") as escritor:
+            for lote in leitor:
+                lote = pa.RecordBatch.from_arrays(
+                    [coluna.cast(pa.date32()) if nome in COLUNAS_DATA else coluna
+                     for nome, coluna in zip(lote.schema.names, lote.columns)],
+                    schema=esquema,
+                )
+                escritor.write_batch(lote, row_group_size=linhas_por_grupo)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return destino
+
+def cache_vendas(caminho=CAMINHO_VENDAS):
+    """
+    Caminho do cache Parquet do histórico, convertido antes se ainda não existir ou se o CSV
+    mudou. Retorna None se esta versão do CSV não pode ser convertida (ver carregar_vendas).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    origem = _origem(caminho)
+    destinos = (caminho_cache_vendas(caminho), _caminho_cache_temporario(caminho))
+    with _trava_cache:
+        if _falhas_cache.get(caminho) == origem:
+            return None
+        for destino in destinos:
+            try:
+                metadados = pq.read_schema(destino).metadata or {}
+            except (OSError, ValueError):
+                continue
+            if all(metadados.get(chave) == valor for chave, valor in origem.items()):
+                return destino
+
+        for inteiros in (True, False):
+            for destino in destinos:
+                try:
+                    return converter_vendas(caminho, destino, inteiros=inteiros)
+                except pa.ArrowInvalid:
+                    break  # o CSV não cabe nestes tipos: tenta os flexíveis
+                except OSError:
+                    continue  # pasta sem permissão de escrita: tenta a temporária
+        _falhas_cache[caminho] = origem
+        return None
+
+def _colunas_filtros(filtros):
+    grupos = filtros if filtros and isinstance(filtros[0], list) else [filtros or []]
+    return [coluna for grupo in grupos for coluna, _, _ in grupo]
+
+def _ler_csv(caminho, colunas=None, filtros=None):
+    """
+    Leitura direta do CSV, com os mesmos tipos e filtros do cache, para quando ele não pôde ser
+    gerado. Valores que não são números ou datas válidas viram NaN/NaT.
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    usadas = None if colunas is None else list(dict.fromkeys([*colunas, *_colunas_filtros(filtros)]))
+    df = pd.read_csv(caminho, usecols=usadas, dtype=str, encoding="utf-8-sig")
+    for coluna in df.columns:
+        if coluna in COLUNAS_DATA:
+            df[coluna] = pd.to_datetime(df[coluna], format="%d/%m/%Y", errors="coerce")
+        elif coluna in COLUNAS_INTEIRAS or coluna in COLUNAS_DECIMAIS:
+            df[coluna] = pd.to_numeric(df[coluna], errors="coerce")
+        else:
+            df[coluna] = df[coluna].astype("category")
+    if filtros:
+        tabela = pa.Table.from_pandas(df, preserve_index=False)
+        # Os filtros comparam datas com datetime.date, como no cache (date32)
+        for coluna in COLUNAS_DATA:
+            if coluna in tabela.column_names:
+                tabela = tabela.set_column(tabela.column_names.index(coluna), coluna, pc.cast(tabela[coluna], pa.date32()))
+        df = tabela.filter(pq.filters_to_expression(filtros)).to_pandas(date_as_object=False)
+    return df if colunas is None else df[list(colunas)]
+
+def carregar_vendas(colunas=None, filtros=None, caminho=CAMINHO_VENDAS):
+    """
+    Histórico de vendas como DataFrame, lido do cache colunar.
+
+    `colunas` limita as colunas lidas; `filtros` usa o formato do pyarrow, por exemplo
+    [("Data_Emissao", ">=", date(2025, 7, 1))], e descarta pelas estatísticas os grupos de
+    linhas que não podem atender ao filtro antes de lê-los. Datas chegam como datetime64 e
+    textos repetidos como Categorical. Sem o cache (cache_vendas devolveu None), lê o CSV.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    destino = cache_vendas(caminho)
+    if destino is None:
+        return _ler_csv(caminho, colunas, filtros)
+    tabela = pq.read_table(destino, columns=colunas, filters=filtros, memory_map=True)
+    # split_blocks + self_destruct: cada coluna do Arrow é liberada assim que vira coluna do pandas,
+    # em vez de as duas cópias da tabela inteira existirem ao mesmo tempo
+    df = tabela.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+    del tabela
+    pa.default_memory_pool().release_unused()  # devolve ao sistema os buffers já liberados
+    return df
+
+def contar_clientes(caminho=CAMINHO_VENDAS):
+    """
+    Conta as linhas de venda de cada cliente, lendo só a coluna Cliente do cache colunar.
+    """
+    contagem = Counter()
+    for nome, linhas in carregar_vendas(["Cliente"], caminho=caminho)["Cliente"].value_counts().items():
+        nome = str(nome).strip()
+        if nome and linhas:
+            contagem[nome] += int(linhas)
+    return contagem
+
+# --- Índice de Nomes de Clientes ---
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+class IndiceNomes:
+    """
+    Índice para autocompletar nomes de clientes, sem diferenciar acentos e maiúsculas:
+      - lista dos nomes normalizados em ordem alfabética, para achar por prefixo (busca binária);
+      - índice de trigramas, para achar o texto digitado no meio do nome ("cancer" -> "INSTITUTO DO CANCER").
+    As sugestões de cada grupo saem dos clientes com mais linhas de venda.
+    """
+
+    def __init__(self, contagem):
+        # Nomes que só diferem em acentos/maiúsculas viram um só, exibido na grafia mais frequente
+        grupos = defaultdict(Counter)
+        for nome, linhas in contagem.items():
+            grupos[normalizar_texto(nome)][nome] += linhas
+        self._normalizados = sorted(grupos)
+        self._nomes = [grupos[chave].most_common(1)[0][0] for chave in self._normalizados]
+        self._linhas = array("I", (sum(grupos[chave].values()) for chave in self._normalizados))
+
+        trigramas = defaultdict(lambda: array("I"))
+        for i, normalizado in enumerate(self._normalizados):
+            for trigrama in _trigramas(normalizado):
+                trigramas[trigrama].append(i)
+        self._trigramas = dict(trigramas)
+
+    @classmethod
+    def do_arquivo(cls, caminho=CAMINHO_VENDAS):
+        return cls(contar_clientes(caminho))
+
+    def __len__(self):
+        return len(self._nomes)
+
+    def __contains__(self, nome):
+        normalizado = normalizar_texto(nome)
+        i = bisect_left(self._normalizados, normalizado)
+        return i < len(self._normalizados) and self._normalizados[i] == normalizado
+
+    def sugerir(self, texto, limite=8):
+        """
+        Até `limite` nomes: primeiro os que começam pelo texto, depois os que o contêm.
+        """
+        consulta = normalizar_texto(texto)
+        if not consulta:
+            return []
+        inicio = bisect_left(self._normalizados, consulta)
+        fim = bisect_left(self._normalizados, consulta[:-1] + chr(ord(consulta[-1]) + 1), inicio)
+        frequencia = self._linhas.__getitem__
+        indices = nlargest(limite, range(inicio, fim), key=frequencia)
+
+        if len(indices) < limite and len(consulta) >= 3:
+            listas = sorted((self._trigramas.get(t, ()) for t in _trigramas(consulta)), key=len)
+            candidatos = set(listas[0]).intersection(*listas[1:]) if listas[0] else set()
+            contem = (i for i in candidatos if not inicio <= i < fim and consulta in self._normalizados[i])
+            indices += nlargest(limite - len(indices), contem, key=frequencia)
+        return [self._nomes[i] for i in indices]
+
+# --- Resumo de Vendas por Cliente ---
+COLUNAS_RESUMO = ["Empresa", "NF", "Data_Emissao", "Qtd_Prazo_Medio", "Valor_Total_Item", "Linha",
+                  "Cliente", "Total_Lucro_Venda_Item", "situacao"]
+
+ResumoCliente = namedtuple(
+    "ResumoCliente", "cliente valor_total lucro_total notas ultima_emissao prazo_medio linha_principal canceladas"
+)
+
+class _Acumulado:
+    """
+    Totais de um cliente que podem ser somados bloco a bloco.
+    """
+    __slots__ = ("cliente", "notas", "prazo", "canceladas", "ultima_emissao", "por_linha")
+
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.notas = set()  # (Empresa, NF): cada nota conta uma vez, mesmo com itens em blocos diferentes
+        self.prazo = 0.0
+        self.canceladas = 0
+        self.ultima_emissao = None
+        self.por_linha = defaultdict(lambda: [0.0, 0.0])  # Linha -> [valor, lucro], só notas faturadas
+
+    def resumo(self):
+        quantidade = len(self.notas)
+        linha_principal = max(self.por_linha, key=lambda linha: self.por_linha[linha][0], default="")
+        return ResumoCliente(
+            cliente=self.cliente,
+            valor_total=sum(valor for valor, _ in self.por_linha.values()),
+            lucro_total=sum(lucro for _, lucro in self.por_linha.values()),
+            notas=quantidade,
+            ultima_emissao=self.ultima_emissao,
+            prazo_medio=self.prazo / quantidade if quantidade else 0.0,
+            linha_principal=linha_principal,
+            canceladas=self.canceladas / quantidade if quantidade else 0.0,
+        )
+
+class ResumoVendas:
+    """
+    Resumo das vendas de cada cliente (valor, lucro, notas, última emissão, prazo médio, linha
+    mais vendida e fração de notas canceladas), mantido em memória e compartilhado entre sessões.
+
+    O histórico é tratado como um arquivo que só cresce: atualizar() lê apenas as linhas
+    acrescentadas desde a última leitura e soma os totais delas aos que já existiam. Se o arquivo
+    diminuir ou o início dele mudar, o resumo é refeito do zero. Cada resumo fica pronto a cada
+    atualização, então buscar() é só uma consulta a um dict.
+    """
+
+    def __init__(self, caminho=CAMINHO_VENDAS, tamanho_bloco=64 * 1024 * 1024):
+        self.caminho = caminho
+        self.tamanho_bloco = tamanho_bloco
+        self._trava = threading.Lock()
+        self._zerar()
+
+    def _zerar(self):
+        self._acumulados = {}
+        self._resumos = {}
+        self._colunas = None
+        self._inicio = b""  # primeiros bytes do arquivo, para perceber se ele foi trocado
+        self._lido = 0      # posição (bytes) até onde o arquivo já foi somado
+        self._versao = None
+
+    def buscar(self, nome):
+        """
+        ResumoCliente do cliente (sem diferenciar acentos e maiúsculas), ou None.
+        """
+        return self._resumos.get(normalizar_texto(nome))
+
+    def atualizar(self):
+        """
+        Soma ao resumo as linhas novas do arquivo e retorna quantas foram lidas.
+        Levanta OSError se o arquivo não existir.
+        """
+        info = os.stat(self.caminho)
+        versao = (info.st_mtime_ns, info.st_size)
+        if versao == self._versao:
+            return 0  # caso comum: nada mudou desde o último rerun
+        with self._trava:
+            if versao == self._versao:
+                return 0
+            with open(self.caminho, "rb") as arquivo:
+                inicio = arquivo.read(4096)
+                if info.st_size < self._lido or not inicio.startswith(self._inicio):
+                    self._zerar()
+                if self._colunas is None:
+                    arquivo.seek(0)
+                    cabecalho = arquivo.readline()
+                    self._colunas = next(csv.reader([cabecalho.decode("utf-8-sig")]))
+                    self._lido = len(cabecalho)
+                lidas = self._ler_ate(arquivo, info.st_size)
+            self._inicio = inicio
+            self._versao = versao
+            return lidas
+
+    def _ler_ate(self, arquivo, fim):
+        # Lê em blocos de linhas completas; uma linha ainda incompleta no fim do arquivo
+        # (gravação em andamento) fica para a próxima atualização.
+        arquivo.seek(self._lido)
+        lidas, pendente = 0, b""
+        while arquivo.tell() < fim:
+            dados = pendente + arquivo.read(min(self.tamanho_bloco, fim - arquivo.tell()))
+            corte = dados.rfind(b"\n") + 1
+            dados, pendente = dados[:corte], dados[corte:]
+            if dados:
+                lidas += self._somar(dados)
+        self._lido = fim - len(pendente)
+        return lidas
+
+    def _somar(self, dados):
+        import pandas as pd
+
+        # Colunas numéricas já convertidas pelo leitor; vazias viram 0
+        numericas = ("Qtd_Prazo_Medio", "Valor_Total_Item", "Total_Lucro_Venda_Item")
+        bloco = pd.read_csv(BytesIO(dados), names=self._colunas, header=None, usecols=COLUNAS_RESUMO,
+                            dtype={coluna: float if coluna in numericas else str for coluna in COLUNAS_RESUMO},
+                            keep_default_na=False, na_values={coluna: [""] for coluna in numericas},
+                            encoding="utf-8")
+        nomes = bloco["Cliente"].str.strip()
+        bloco = bloco[nomes != ""].assign(cliente=nomes)
+        if bloco.empty:
+            return 0
+        chaves = {nome: normalizar_texto(nome) for nome in bloco["cliente"].unique()}
+        bloco = bloco.fillna({coluna: 0.0 for coluna in numericas}).assign(
+            chave=bloco["cliente"].map(chaves),
+            emissao=pd.to_datetime(bloco["Data_Emissao"], format="%d/%m/%Y", errors="coerce"),
+            cancelada=bloco["situacao"].str.strip().str.casefold() == "cancelada",
+        )
+
+        # Uma passada agrupada por bloco: uma linha por nota fiscal e uma por (cliente, Linha)
+        notas = bloco.groupby(["chave", "Empresa", "NF"], sort=False).agg(
+            cliente=("cliente", "last"), prazo=("Qtd_Prazo_Medio", "first"),
+            cancelada=("cancelada", "any"), emissao=("emissao", "max"),
+        )
+        por_linha = bloco[~bloco["cancelada"]].groupby(["chave", "Linha"], sort=False)[
+            ["Valor_Total_Item", "Total_Lucro_Venda_Item"]].sum()
+
+        alterados = set()
+        for (chave, empresa, nf), cliente, prazo, cancelada, emissao in zip(
+                notas.index, notas["cliente"], notas["prazo"], notas["cancelada"], notas["emissao"]):
+            acumulado = self._acumulados.get(chave)
+            if acumulado is None:
+                acumulado = self._acumulados[chave] = _Acumulado(cliente)
+            alterados.add(chave)
+            if pd.notna(emissao):
+                emissao = emissao.date()
+                if acumulado.ultima_emissao is None or emissao > acumulado.ultima_emissao:
+                    acumulado.ultima_emissao = emissao
+            if (empresa, nf) not in acumulado.notas:
+                acumulado.notas.add((empresa, nf))
+                acumulado.prazo += prazo
+                acumulado.canceladas += bool(cancelada)
+        for (chave, linha), valor, lucro in zip(
+                por_linha.index, por_linha["Valor_Total_Item"], por_linha["Total_Lucro_Venda_Item"]):
+            totais = self._acumulados[chave].por_linha[linha]
+            totais[0] += valor
+            totais[1] += lucro
+
+        for chave in alterados:
+            self._resumos[chave] = self._acumulados[chave].resumo()
+        return len(bloco)